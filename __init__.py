@@ -4,10 +4,24 @@ WEB_DIRECTORY = "./web"
 
 # ComfyUI custom_nodes 로더에 의해 패키지로 임포트될 때만 라우트 등록
 try:
+    from server import PromptServer
+
+    from .nodes import graph_metrics  # noqa: F401, E402
+    from .nodes import graph_catalog  # noqa: F401, E402
     from .nodes import graph_control  # noqa: F401, E402
+    from .nodes import graph_template  # noqa: F401, E402
     from .ws import graph_ws  # noqa: F401, E402
-except ImportError:
-    pass
+    from .nodes import graph_diff  # noqa: F401, E402
+
+    graph_ws.install_execution_hook()
+    # 카탈로그는 요청 경로가 아니라 서버 시작 후 백그라운드에서 빌드한다 (GRAPH_CONTROL_WARMUP)
+    graph_catalog.install_warmup(PromptServer.instance.app)
+except ImportError as e:
+    # ComfyUI 밖(server 모듈 없음)에서 임포트된 경우만 조용히 넘어간다
+    if e.name != "server":
+        import logging
+
+        logging.getLogger(__name__).exception("[GraphControlEndpoint] 라우트 등록 실패")
 
 NODE_CLASS_MAPPINGS = {}
 NODE_DISPLAY_NAME_MAPPINGS = {}
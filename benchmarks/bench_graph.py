@@ -0,0 +1,250 @@
+"""그래프 엔드포인트 벤치마크.
+
+실제 라우트를 인프로세스 가짜 브라우저(GraphModel 기반)에 연결해 측정하고
+결과를 JSON으로 출력한다. 저장소 루트에서 실행한다:
+
+    python -m benchmarks.bench_graph --output bench.json
+    python -m benchmarks.bench_graph --baseline bench.json   # 이전 결과와 비교
+"""
+
+import argparse
+import asyncio
+import json
+import platform
+import sys
+import time
+import uuid
+
+from benchmarks.fake_browser import FakeBrowser, install_fake_server
+
+fake_server = install_fake_server()
+
+# 가짜 server 모듈 설치 후에 임포트해야 라우트가 fake_server.app에 등록된다
+import nodes  # noqa: E402
+import nodes.graph_control as graph_control  # noqa: E402
+import nodes.graph_diff  # noqa: E402, F401
+import nodes.graph_metrics  # noqa: E402, F401
+import nodes.graph_template  # noqa: E402, F401
+import ws.graph_ws as graph_ws  # noqa: E402
+from aiohttp.test_utils import TestClient, TestServer  # noqa: E402
+from nodes.graph_model import GraphModel  # noqa: E402
+
+
+def make_node_classes(count):
+    """INPUT_TYPES를 가진 합성 노드 클래스 count개를 만든다."""
+    choices = [f"model_{i}.safetensors" for i in range(50)]
+    mappings = {}
+    for i in range(count):
+        def input_types(cls, _choices=choices):
+            return {
+                "required": {
+                    "model": ("MODEL",),
+                    "seed": ("INT", {"default": 0, "min": 0}),
+                    "steps": ("INT", {"default": 20}),
+                    "ckpt_name": (list(_choices),),
+                },
+                "optional": {
+                    "text": ("STRING", {"multiline": True}),
+                },
+            }
+        mappings[f"SynthNode{i}"] = type(f"SynthNode{i}", (), {
+            "CATEGORY": f"synthetic/pack{i % 50}",
+            "RETURN_TYPES": ("MODEL", "LATENT"),
+            "DESCRIPTION": f"synthetic node {i}",
+            "INPUT_TYPES": classmethod(input_types),
+        })
+    return mappings
+
+
+def make_graph(node_count):
+    """node_count개 노드가 사슬로 연결된 워크플로를 만든다."""
+    graph = {"nodes": [], "links": []}
+    for i in range(1, node_count + 1):
+        graph["nodes"].append({
+            "id": i,
+            "type": "SynthNode0",
+            "pos": [i * 10, 0],
+            "widgets_values": [i, "fixed", 20, "model_0.safetensors", "text"],
+        })
+        if i > 1:
+            graph["links"].append([i - 1, i - 1, 0, i, 0, "MODEL"])
+    return graph
+
+
+def latency_stats(samples):
+    """초 단위 샘플을 ms 단위 통계로 요약한다."""
+    ordered = sorted(samples)
+
+    def pct(q):
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))] * 1000
+
+    return {
+        "n": len(ordered),
+        "mean_ms": sum(ordered) / len(ordered) * 1000,
+        "p50_ms": pct(0.5),
+        "p95_ms": pct(0.95),
+        "p99_ms": pct(0.99),
+        "max_ms": ordered[-1] * 1000,
+    }
+
+
+async def bench_batch(client, browser, batch_size, batches):
+    """/batch 처리량 (commands/sec)."""
+    commands = []
+    for i in range(batch_size // 2):
+        commands.append({"type": "create_node", "node_type": "SynthNode0", "x": i, "y": 0})
+        commands.append({"type": "set_widget", "node_id": i + 1, "name": "steps", "value": 30})
+    body = {"commands": commands}
+
+    browser.model.configure({})
+    applied_before = browser.commands_applied
+    start = time.perf_counter()
+    for _ in range(batches):
+        resp = await client.post("/comfy/graph/batch", json=body)
+        await resp.read()
+    elapsed = time.perf_counter() - start
+
+    total = len(commands) * batches
+    return {
+        "batch_size": len(commands),
+        "batches": batches,
+        "commands": total,
+        "applied": browser.commands_applied - applied_before,
+        "seconds": elapsed,
+        "commands_per_sec": total / elapsed,
+    }
+
+
+async def bench_get_graph(client, browser, sizes, iterations):
+    """WS get_graph 왕복 지연 (노드 수별)."""
+    results = {}
+    async with client.ws_connect("/comfy/graph/ws") as ws:
+        for size in sizes:
+            browser.model.configure(make_graph(size))
+            samples = []
+            response_bytes = 0
+            for i in range(iterations + 3):
+                start = time.perf_counter()
+                await ws.send_json({"request_id": str(uuid.uuid4()), "type": "get_graph"})
+                msg = await ws.receive()
+                elapsed = time.perf_counter() - start
+                if json.loads(msg.data).get("status") != "ok":
+                    raise RuntimeError(f"get_graph failed: {msg.data}")
+                if i >= 3:   # 워밍업 제외
+                    samples.append(elapsed)
+                    response_bytes = len(msg.data)
+            results[str(size)] = dict(latency_stats(samples), response_bytes=response_bytes)
+    return results
+
+
+async def bench_catalog(client, class_count, iterations):
+    """카탈로그 엔드포인트 비용 (합성 노드 클래스 class_count개)."""
+    nodes.NODE_CLASS_MAPPINGS = make_node_classes(class_count)
+    results = {"classes": class_count}
+    for path in ("/comfy/graph/node_types", "/comfy/graph/all_nodes"):
+        samples = []
+        response_bytes = 0
+        for _ in range(iterations):
+            start = time.perf_counter()
+            resp = await client.get(path)
+            body = await resp.read()
+            samples.append(time.perf_counter() - start)
+            response_bytes = len(body)
+        results[path.rsplit("/", 1)[-1]] = dict(latency_stats(samples), response_bytes=response_bytes)
+    return results
+
+
+async def run(args):
+    fake_server.loop = asyncio.get_running_loop()
+    nodes.NODE_CLASS_MAPPINGS = make_node_classes(1)
+    browser = FakeBrowser(GraphModel(resolve_widgets=graph_control.widget_names), latency=args.latency_ms / 1000)
+    graph_ws.DEFAULT_TIMEOUT = max(graph_ws.DEFAULT_TIMEOUT, 30.0)
+
+    client = TestClient(TestServer(fake_server.app))
+    await client.start_server()
+    await browser.connect(fake_server, client)
+    try:
+        results = {
+            "batch": await bench_batch(client, browser, args.batch_size, args.batches),
+            "get_graph": await bench_get_graph(client, browser, args.sizes, args.iterations),
+            "catalog": await bench_catalog(client, args.catalog_classes, args.catalog_iterations),
+        }
+    finally:
+        await client.close()
+
+    return {
+        "meta": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "params": {
+                "latency_ms": args.latency_ms,
+                "batch_size": args.batch_size,
+                "batches": args.batches,
+                "sizes": args.sizes,
+                "iterations": args.iterations,
+                "catalog_classes": args.catalog_classes,
+                "catalog_iterations": args.catalog_iterations,
+            },
+        },
+        "results": results,
+    }
+
+
+def _flatten(data, prefix=""):
+    for key, value in data.items():
+        path = f"{prefix}.{key}" if prefix else key
+        if isinstance(value, dict):
+            yield from _flatten(value, path)
+        elif isinstance(value, (int, float)):
+            yield path, value
+
+
+def compare(baseline, current):
+    """이전 결과 대비 변화율을 출력한다. _per_sec는 클수록, _ms는 작을수록 좋다."""
+    base = dict(_flatten(baseline["results"]))
+    lines = []
+    for path, value in _flatten(current["results"]):
+        if not (path.endswith("_per_sec") or path.endswith("_ms")) or not base.get(path):
+            continue
+        ratio = value / base[path]
+        better = ratio >= 1 if path.endswith("_per_sec") else ratio <= 1
+        lines.append(f"{path}: {base[path]:.3f} → {value:.3f} ({ratio:.2f}x{'' if better else ' REGRESSION'})")
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--latency-ms", type=float, default=1.0, help="가짜 브라우저 응답 지연")
+    parser.add_argument("--batch-size", type=int, default=100)
+    parser.add_argument("--batches", type=int, default=50)
+    parser.add_argument("--sizes", type=lambda s: [int(x) for x in s.split(",")], default=[10, 100, 1000])
+    parser.add_argument("--iterations", type=int, default=30)
+    parser.add_argument("--catalog-classes", type=int, default=5000)
+    parser.add_argument("--catalog-iterations", type=int, default=5)
+    parser.add_argument("--quick", action="store_true", help="스모크 테스트용 작은 파라미터")
+    parser.add_argument("--output", help="결과 JSON 파일 (기본: stdout)")
+    parser.add_argument("--baseline", help="비교할 이전 결과 JSON 파일")
+    args = parser.parse_args(argv)
+
+    if args.quick:
+        args.batch_size, args.batches = 10, 3
+        args.sizes, args.iterations = [10], 3
+        args.catalog_classes, args.catalog_iterations = 50, 1
+        args.latency_ms = 0.0
+
+    report = asyncio.run(run(args))
+    text = json.dumps(report, indent=2, ensure_ascii=False)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            print(compare(json.load(f), report), file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""벤치마크용 인프로세스 PromptServer와 가짜 브라우저.
+
+실제 라우트 모듈(nodes/graph_control.py, ws/graph_ws.py ...)을 임포트하기 전에
+install_fake_server()로 server 모듈을 설치해야 한다. 라우트는 모듈 임포트 시
+FakePromptServer.instance.app에 그대로 등록된다.
+"""
+
+import asyncio
+import sys
+import types
+
+from aiohttp import web
+
+
+class FakeBrowser:
+    """graph_command를 GraphModel에 적용하고 graph_ws_request에 /state로 회신하는 브라우저."""
+
+    client_id = "fake-browser"
+
+    def __init__(self, model, latency=0.0):
+        self.model = model
+        self.latency = latency
+        self.client = None       # aiohttp TestClient, 벤치마크가 설정
+        self.commands_applied = 0
+        self._tasks = set()
+
+    def receive(self, event, data):
+        if event == "graph_command":
+            self.model.apply(data)
+            self.commands_applied += 1
+        elif event == "graph_ws_request":
+            task = asyncio.ensure_future(self._answer(data))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def connect(self, server, client):
+        """PromptServer 소켓에 연결하고 에디터로 등록한다."""
+        self.client = client
+        server.browser = self
+        server.sockets[self.client_id] = self
+        await client.post("/comfy/graph/presence", json={"client_id": self.client_id})
+
+    async def _answer(self, req):
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        if req.get("type") == "get_graph":
+            result = self.model.serialize()
+        else:
+            self.model.apply(req)
+            result = {"executed": True}
+        # 실제 브라우저처럼 HTTP로 회신해 /state 핸들러와 JSON 비용을 포함한다
+        await self.client.post("/comfy/graph/state", json={
+            "request_id": req.get("request_id"),
+            "data": result,
+            "type": req.get("type"),
+        })
+
+
+class FakePromptServer:
+    """PromptServer.instance 대역. app은 실제 aiohttp Application이다."""
+
+    def __init__(self):
+        self.app = web.Application()
+        self.routes = web.RouteTableDef()
+        self.sockets = {}
+        self.loop = None
+        self.browser = None
+
+    async def send(self, event, data, sid=None):
+        if self.browser is not None:
+            self.browser.receive(event, data)
+
+    def send_sync(self, event, data, sid=None):
+        if self.browser is not None:
+            self.loop.call_soon_threadsafe(self.browser.receive, event, data)
+
+
+def install_fake_server():
+    """sys.modules에 가짜 server 모듈을 설치하고 FakePromptServer 인스턴스를 반환한다."""
+    server_module = types.ModuleType("server")
+    server_class = type("PromptServer", (), {})
+    server_class.instance = FakePromptServer()
+    server_module.PromptServer = server_class
+    sys.modules["server"] = server_module
+    return server_class.instance
@@ -0,0 +1,192 @@
+"""같은 호스트의 여러 ComfyUI 워커가 공유하는 파일 기반 캐시 (로컬 디렉토리의 SQLite).
+
+GRAPH_CONTROL_SHARED_CACHE_DIR를 설정한 경우에만 쓰인다. 캐시는 최적화일 뿐이므로
+SQLite 오류(잠금, 디스크 문제 등)는 경고만 남기고 캐시 미스로 처리한다.
+WAL 모드는 공유 메모리를 쓰므로 네트워크 파일시스템에서는 동작하지 않는다. 캐시를 공유하는
+워커는 같은 호스트(로컬 디스크)에 있어야 한다. 조회는 잠금 대기로 막힐 수 있으므로
+이벤트 루프가 아니라 executor 스레드에서 호출한다.
+"""
+
+import collections
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+import zlib
+
+logger = logging.getLogger(__name__)
+
+# 공유 캐시 디렉토리. 비어 있으면 공유 캐시를 쓰지 않는다.
+SHARED_CACHE_DIR = os.environ.get("GRAPH_CONTROL_SHARED_CACHE_DIR", "")
+
+# 샤드(파일) 하나에 보관하는 최대 항목 수. 넘으면 오래된 항목부터 지운다.
+SHARED_CACHE_MAX_ENTRIES = 1000
+
+# SQLite 잠금 대기 시간 (초)
+_BUSY_TIMEOUT = 5.0
+
+
+class SharedCache:
+    """키 → bytes 저장소. 이름마다 shards개의 SQLite 파일(WAL 모드)로 나눠 쓰기 경합을 줄인다.
+
+    연결은 스레드마다 따로 연다 (카탈로그 빌드는 executor 스레드에서 돈다).
+    """
+
+    def __init__(self, directory, name, shards=1, max_entries=None):
+        self.directory = directory
+        self.name = name
+        self.shards = shards
+        self.max_entries = max_entries or SHARED_CACHE_MAX_ENTRIES
+        self._local = threading.local()
+
+    def _path(self, shard):
+        if self.shards == 1:
+            return os.path.join(self.directory, f"{self.name}.sqlite3")
+        return os.path.join(self.directory, f"{self.name}-{shard}.sqlite3")
+
+    def _connection(self, key):
+        # crc32는 프로세스마다 같으므로 모든 워커가 같은 키를 같은 샤드에서 찾는다
+        shard = zlib.crc32(key.encode()) % self.shards
+        connections = getattr(self._local, "connections", None)
+        if connections is None:
+            connections = self._local.connections = {}
+        conn = connections.get(shard)
+        if conn is None:
+            os.makedirs(self.directory, exist_ok=True)
+            conn = sqlite3.connect(self._path(shard), timeout=_BUSY_TIMEOUT, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS entries (key TEXT PRIMARY KEY, value BLOB NOT NULL, created REAL NOT NULL)"
+            )
+            # put()의 오래된 항목 정리가 정렬 없이 색인을 따라가게 한다
+            conn.execute("CREATE INDEX IF NOT EXISTS entries_created ON entries (created)")
+            connections[shard] = conn
+        return conn
+
+    def get(self, key):
+        """키의 값을 반환한다. 없거나 읽을 수 없으면 None."""
+        try:
+            row = self._connection(key).execute("SELECT value FROM entries WHERE key = ?", (key,)).fetchone()
+        except (sqlite3.Error, OSError) as e:
+            logger.warning("[GraphControlEndpoint] 공유 캐시 읽기 실패 (%s): %s", self.name, e)
+            return None
+        return row[0] if row else None
+
+    def put(self, key, value):
+        """키에 값을 저장한다. 실패하면 False."""
+        try:
+            conn = self._connection(key)
+            conn.execute(
+                "INSERT OR REPLACE INTO entries (key, value, created) VALUES (?, ?, ?)",
+                (key, value, time.time()),
+            )
+            conn.execute(
+                "DELETE FROM entries WHERE key IN "
+                "(SELECT key FROM entries ORDER BY created DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,),
+            )
+        except (sqlite3.Error, OSError) as e:
+            logger.warning("[GraphControlEndpoint] 공유 캐시 쓰기 실패 (%s): %s", self.name, e)
+            return False
+        return True
+
+    def get_json(self, key):
+        """zlib으로 압축된 JSON 값을 읽어 반환한다. 없거나 깨졌으면 None."""
+        blob = self.get(key)
+        if blob is None:
+            return None
+        try:
+            return json.loads(zlib.decompress(blob))
+        except (zlib.error, ValueError):
+            return None
+
+    def put_json(self, key, value):
+        """값을 JSON으로 직렬화해 압축 저장한다. 직렬화할 수 없으면 False."""
+        try:
+            text = json.dumps(value)
+        except (TypeError, ValueError):
+            return False
+        return self.put(key, zlib.compress(text.encode()))
+
+
+def shared_cache(name, shards=1):
+    """SHARED_CACHE_DIR가 설정되어 있으면 name 공유 캐시를, 아니면 None을 반환한다."""
+    if not SHARED_CACHE_DIR:
+        return None
+    return SharedCache(SHARED_CACHE_DIR, name, shards=shards)
+
+
+class GraphFileCache:
+    """saved_graphs/ 파일의 파싱 결과 캐시. 내용 해시로 식별한다.
+
+    파일 (경로, mtime, 크기) → 내용 해시 색인으로 바뀌지 않은 파일은 다시 읽지 않고,
+    파싱된 그래프는 프로세스 안의 LRU와 공유 캐시(압축)에 내용 해시로 보관한다.
+    반환한 그래프는 여러 호출자가 공유하므로 수정하면 안 된다.
+    """
+
+    def __init__(self, shared=None, max_entries=64):
+        self.shared = shared
+        self.max_entries = max_entries
+        self._lock = threading.Lock()   # executor 스레드 여러 개에서 호출된다
+        self._index = {}     # path → (mtime_ns, size, digest)
+        self._parsed = collections.OrderedDict()   # digest → graph
+
+    def load(self, path):
+        """path의 그래프를 반환한다. 파일이 없으면 OSError, JSON이 아니면 ValueError."""
+        stat = os.stat(path)
+        signature = f"{os.path.abspath(path)}:{stat.st_mtime_ns}:{stat.st_size}"
+        with self._lock:
+            known = self._index.get(path)
+        digest = known[2] if known and known[:2] == (stat.st_mtime_ns, stat.st_size) else None
+        if digest is None and self.shared is not None:
+            digest = (self.shared.get(f"stat:{signature}") or b"").decode() or None
+
+        if digest is not None:
+            graph = self._lookup(digest)
+            if graph is not None:
+                with self._lock:
+                    self._index[path] = (stat.st_mtime_ns, stat.st_size, digest)
+                return graph
+
+        with open(path, "rb") as f:
+            content = f.read()
+        graph = json.loads(content)
+        self.store(path, content, graph)
+        return graph
+
+    def store(self, path, content, graph):
+        """방금 쓰거나 읽은 파일 내용과 파싱 결과를 캐시에 넣는다."""
+        stat = os.stat(path)
+        digest = hashlib.sha256(content).hexdigest()
+        with self._lock:
+            self._index[path] = (stat.st_mtime_ns, stat.st_size, digest)
+        self._remember(digest, graph)
+        if self.shared is not None:
+            signature = f"{os.path.abspath(path)}:{stat.st_mtime_ns}:{stat.st_size}"
+            if self.shared.get(f"graph:{digest}") is None:
+                self.shared.put(f"graph:{digest}", zlib.compress(content))
+            self.shared.put(f"stat:{signature}", digest.encode())
+
+    def _lookup(self, digest):
+        with self._lock:
+            graph = self._parsed.get(digest)
+            if graph is not None:
+                self._parsed.move_to_end(digest)
+                return graph
+        if self.shared is None:
+            return None
+        graph = self.shared.get_json(f"graph:{digest}")
+        if graph is not None:
+            self._remember(digest, graph)
+        return graph
+
+    def _remember(self, digest, graph):
+        with self._lock:
+            self._parsed[digest] = graph
+            self._parsed.move_to_end(digest)
+            while len(self._parsed) > self.max_entries:
+                self._parsed.popitem(last=False)
@@ -0,0 +1,475 @@
+"""노드 카탈로그: INPUT_TYPES 스윕 한 번으로 만든 node_types/all_nodes 캐시와 워밍업."""
+
+import asyncio
+import collections
+import hashlib
+import itertools
+import json
+import logging
+import os
+import queue
+import re
+import sys
+import threading
+import time
+
+from aiohttp import web
+from server import PromptServer
+
+from .graph_cache import shared_cache
+from .graph_metrics import instrument, metrics
+
+logger = logging.getLogger(__name__)
+
+# 카탈로그 준비 방식: "background" — 서버 시작 직후 백그라운드 스레드에서 빌드,
+# "lazy" — 첫 카탈로그 요청 때 빌드
+WARMUP_MODE = os.environ.get("GRAPH_CONTROL_WARMUP", "background")
+
+# INPUT_TYPES()를 동시에 호출하는 워커 수와 클래스당 제한 시간 (초)
+CATALOG_WORKERS = int(os.environ.get("GRAPH_CONTROL_CATALOG_WORKERS", "8"))
+INPUT_TYPES_TIMEOUT = float(os.environ.get("GRAPH_CONTROL_INPUT_TYPES_TIMEOUT", "10"))
+
+# 이보다 오래 걸린 INPUT_TYPES() 결과는 모델/입력 디렉토리가 바뀔 때까지 재사용한다 (초)
+SLOW_INPUT_TYPES_SECONDS = 0.05
+
+# 모델/입력 디렉토리 변경을 확인하는 최소 간격 (초)
+MODEL_DIRS_CHECK_SECONDS = 10.0
+
+# 타임아웃 검사 주기 (초)
+_POLL_SECONDS = 0.05
+
+# 모델 디렉토리 지문에서 제외하는 folder_paths 항목과 디렉토리 이름
+_SKIP_FOLDERS = frozenset(("custom_nodes",))
+_SKIP_DIRS = frozenset(("__pycache__", "node_modules"))
+
+
+def node_class_mappings():
+    """ComfyUI의 NODE_CLASS_MAPPINGS를 반환한다."""
+    nodes_mod = sys.modules.get("nodes")
+    return getattr(nodes_mod, "NODE_CLASS_MAPPINGS", {})
+
+
+def fingerprint(mappings):
+    """노드 클래스 구성의 지문. 이름과 클래스 위치(모듈.qualname)로 계산하므로 프로세스 간에도 같다."""
+    digest = hashlib.sha1()
+    for name, cls in mappings.items():
+        digest.update(f"{name}={_location(cls)}\n".encode())
+    return digest.hexdigest()
+
+
+def node_pack(cls):
+    """노드 클래스가 속한 노드 팩. ComfyUI가 붙이는 RELATIVE_PYTHON_MODULE(예: custom_nodes.X)을 우선한다."""
+    relative = getattr(cls, "RELATIVE_PYTHON_MODULE", None)
+    if relative:
+        return relative
+    return (getattr(cls, "__module__", "") or "").split(".")[0]
+
+
+def watched_dirs():
+    """INPUT_TYPES()가 나열하는 파일 목록(COMBO)에 영향을 주는 디렉토리 목록.
+
+    folder_paths의 모델 디렉토리와 입력 디렉토리를 한 번 훑어, 모델(입력) 파일이 있거나 비어 있는
+    디렉토리와 그 상위 디렉토리만 고른다. custom_nodes와 숨김/캐시 디렉토리(.git, __pycache__ 등)는
+    보지 않는다. 빌드할 때만 호출하고, 이후 변경 확인은 고른 디렉토리를 stat만 한다.
+    """
+    folder_paths = sys.modules.get("folder_paths")
+    folders = getattr(folder_paths, "folder_names_and_paths", None) or {}
+    roots = {}   # 경로 → 확장자 집합, None이면 모든 파일
+    for name, value in folders.items():
+        if name in _SKIP_FOLDERS:
+            continue
+        extensions = set(value[1]) if len(value) > 1 and value[1] else None
+        for path in value[0]:
+            path = os.path.normpath(path)
+            known = roots.get(path, set())
+            roots[path] = None if known is None or extensions is None else known | extensions
+    # LoadImage 등은 입력 디렉토리의 파일 목록을 COMBO로 내놓는다
+    get_input_directory = getattr(folder_paths, "get_input_directory", None)
+    if callable(get_input_directory):
+        roots[os.path.normpath(get_input_directory())] = None
+
+    watched = set()
+    for root, extensions in roots.items():
+        watched.add(root)
+        for dirpath, dirnames, filenames in os.walk(root):
+            dirnames[:] = [d for d in dirnames if not d.startswith(".") and d not in _SKIP_DIRS]
+            if filenames and not any(_is_model_file(f, extensions) for f in filenames):
+                continue
+            # 파일이 추가/삭제되면 그 디렉토리의, 하위 디렉토리가 생기면 상위의 mtime이 바뀐다
+            path = dirpath
+            while path not in watched:
+                watched.add(path)
+                path = os.path.dirname(path)
+    return sorted(watched)
+
+
+def model_dirs_fingerprint(dirs):
+    """디렉토리 목록의 mtime 지문. 디렉토리를 다시 훑지 않고 stat만 한다."""
+    digest = hashlib.sha1()
+    for path in dirs:
+        try:
+            mtime = os.stat(path).st_mtime_ns
+        except OSError:
+            mtime = "missing"
+        digest.update(f"{path}={mtime}\n".encode())
+    return digest.hexdigest()
+
+
+def _is_model_file(filename, extensions):
+    return extensions is None or os.path.splitext(filename)[1].lower() in extensions
+
+
+def describe(cls):
+    """노드 클래스 하나의 카탈로그 항목. INPUT_TYPES 등이 실패하면 ok=False."""
+    category = getattr(cls, "CATEGORY", "")
+    try:
+        description = getattr(cls, "DESCRIPTION", "")
+        if not description:
+            description = (cls.__doc__ or "").strip()
+        return {
+            "ok": True,
+            "category": category,
+            "description": description,
+            "input": cls.INPUT_TYPES() if hasattr(cls, "INPUT_TYPES") else {},
+            "output": list(getattr(cls, "RETURN_TYPES", ())),
+        }
+    except Exception:
+        return {"ok": False, "category": category}
+
+
+def _node_types_entry(entry):
+    if not entry["ok"]:
+        return {"input": {}, "output": [], "category": ""}
+    return {"input": entry["input"], "output": entry["output"], "category": entry["category"]}
+
+
+def _all_nodes_entry(entry):
+    try:
+        if not entry["ok"]:
+            raise ValueError("INPUT_TYPES failed")
+        input_names = []
+        for section in ("required", "optional"):
+            if section in entry["input"]:
+                for key, val in entry["input"][section].items():
+                    type_name = val[0] if isinstance(val, (list, tuple)) else str(val)
+                    input_names.append({"name": key, "type": type_name})
+        return {
+            "description": entry["description"],
+            "category": entry["category"],
+            "inputs": input_names,
+            "outputs": entry["output"],
+        }
+    except Exception:
+        return {"description": "", "category": "", "inputs": [], "outputs": []}
+
+
+_VIEWS = {"node_types": _node_types_entry, "all_nodes": _all_nodes_entry}
+
+
+class NodeCatalog:
+    """NODE_CLASS_MAPPINGS 전체를 한 번 훑어 만든 카탈로그.
+
+    노드 클래스 구성(fingerprint)이나 모델/입력 디렉토리가 바뀌거나 refresh를 요청할 때만
+    다시 빌드하며, node_types/all_nodes 뷰와 그 JSON 직렬화도 빌드마다 한 번만 만든다.
+
+    빌드는 INPUT_TYPES()를 워커 스레드에서 병렬로 호출하고 클래스마다 INPUT_TYPES_TIMEOUT을
+    적용한다. 제한 시간을 넘긴 클래스는 실패한 클래스와 같이 빈 항목이 되고 빌드는 새 워커로
+    계속된다 (스레드는 중단할 수 없으므로 호출 자체는 백그라운드에서 끝날 때까지 남는다).
+    클래스별 소요 시간은 costs에 남는다.
+
+    shared(SharedCache)가 있으면 (노드 구성 지문, 모델 디렉토리 지문)을 키로 빌드 결과를
+    공유해, 같은 구성의 다른 워커가 이미 만든 카탈로그는 다시 빌드하지 않는다.
+    """
+
+    def __init__(self, shared=None):
+        self.shared = shared
+        self.source = None     # "built" 또는 "shared" (다른 워커가 빌드한 결과)
+        self._lock = threading.Lock()
+        self._mappings_key = None   # (id, len) → fingerprint 메모
+        self._mappings_fingerprint = None
+        self.fingerprint = None
+        self.models_fingerprint = None
+        self._watched_dirs = []
+        self._models_checked_at = 0.0
+        self.built_at = None
+        self.build_seconds = None
+        self._entries = {}
+        self._views = {}
+        self.costs = {}        # name → {"pack", "seconds", "status", "cached"}
+        self._slow = {}        # name → (클래스 위치, models_fingerprint, 항목)
+        self._hung = {}        # 제한 시간을 넘긴 호출이 아직 끝나지 않은 클래스 → 시작 시각
+        self._hung_lock = threading.Lock()
+
+    def _fingerprint(self, mappings):
+        # ComfyUI는 커스텀 노드를 로드하며 같은 dict에 항목을 추가만 하므로 (id, len)으로 충분하다
+        key = (id(mappings), len(mappings))
+        if key != self._mappings_key:
+            self._mappings_fingerprint = fingerprint(mappings)
+            self._mappings_key = key
+        return self._mappings_fingerprint
+
+    def is_current(self, mappings):
+        """mappings에 대한 카탈로그가 이미 빌드되어 있으면 True. 모델 디렉토리는 보지 않는다."""
+        return self.fingerprint is not None and self._fingerprint(mappings) == self.fingerprint
+
+    def _models_check_due(self):
+        return time.monotonic() - self._models_checked_at >= MODEL_DIRS_CHECK_SECONDS
+
+    def _models_changed(self):
+        if not self._models_check_due():
+            return False
+        self._models_checked_at = time.monotonic()
+        return model_dirs_fingerprint(self._watched_dirs) != self.models_fingerprint
+
+    def build(self, mappings, refresh=False):
+        """필요하면 카탈로그를 빌드한다. 다른 스레드가 빌드 중이면 끝날 때까지 기다린다."""
+        with self._lock:
+            if refresh or not self.is_current(mappings) or self._models_changed():
+                self._build(mappings, refresh)
+
+    def _build(self, mappings, refresh=False):
+        start = time.perf_counter()
+        self._watched_dirs = watched_dirs()
+        models = model_dirs_fingerprint(self._watched_dirs)
+        self._models_checked_at = time.monotonic()
+        classes = list(mappings.items())
+        shared_key = f"catalog:{self._fingerprint(mappings)}:{models}"
+
+        # refresh는 명시적인 재계산 요청이므로 공유 결과를 쓰지 않고 덮어쓴다
+        if self.shared is not None and not refresh:
+            shared = self.shared.get_json(shared_key)
+            if shared is not None:
+                self._publish(mappings, models, shared["entries"], shared["costs"], start, "shared")
+                return
+
+        entries = {}
+        costs = {}
+        pending = []
+        for name, cls in classes:
+            slow = self._slow.get(name)
+            if slow is not None and slow[0] == _location(cls) and slow[1] == models:
+                entries[name] = slow[2]
+                costs[name] = {"pack": node_pack(cls), "seconds": 0.0, "status": "ok", "cached": True}
+            else:
+                pending.append((name, cls))
+
+        for name, cls, entry, seconds in self._sweep(pending):
+            entries[name] = entry
+            pack = node_pack(cls)
+            status = "timeout" if entry is None else "ok" if entry["ok"] else "error"
+            costs[name] = {"pack": pack, "seconds": seconds, "status": status, "cached": False}
+            if entry is None:
+                entries[name] = {"ok": False, "category": getattr(cls, "CATEGORY", "")}
+                metrics.inc("graph_catalog_input_types_timeouts_total", pack=pack)
+            else:
+                metrics.observe("graph_catalog_input_types_seconds", seconds, pack=pack)
+            if entry is not None and entry["ok"] and seconds >= SLOW_INPUT_TYPES_SECONDS:
+                self._slow[name] = (_location(cls), models, entry)
+            else:
+                self._slow.pop(name, None)
+
+        entries = {name: entries[name] for name, _ in classes}
+        costs = {name: costs[name] for name, _ in classes}
+        # 타임아웃은 그 워커의 사정일 수 있으므로 공유하지 않는다
+        if self.shared is not None and not any(cost["status"] == "timeout" for cost in costs.values()):
+            self.shared.put_json(shared_key, {"entries": entries, "costs": costs})
+        self._publish(mappings, models, entries, costs, start, "built")
+
+    def _publish(self, mappings, models, entries, costs, start, source):
+        if source == "shared":
+            costs = {name: dict(cost, cached=True) for name, cost in costs.items()}
+        self._entries = entries
+        self._views = {}
+        self.costs = costs
+        self.source = source
+        self.fingerprint = self._fingerprint(mappings)
+        self.models_fingerprint = models
+        self.built_at = time.time()
+        self.build_seconds = time.perf_counter() - start
+        metrics.observe("graph_catalog_build_seconds", self.build_seconds)
+        logger.info("[GraphControlEndpoint] 노드 카탈로그 준비 (%s): %d개, %.2fs", source, len(entries), self.build_seconds)
+
+    def _sweep(self, classes):
+        """(name, cls) 목록의 INPUT_TYPES()를 병렬로 호출해 (name, cls, 항목, 초)를 내놓는다.
+
+        제한 시간은 클래스마다 호출을 시작한 시점부터 잰다. 제한 시간을 넘긴 클래스의 항목은
+        None이며, 그 호출에 묶인 워커 스레드는 버리고 새 워커로 바꿔 대기 중인 클래스가
+        계속 진행되게 한다. 이전 빌드에서 제한 시간을 넘긴 호출이 아직 끝나지 않은 클래스는
+        다시 호출하지 않고 바로 None으로 내놓는다 (빌드마다 스레드가 하나씩 쌓이지 않게).
+        """
+        with self._hung_lock:
+            hung = [(name, cls, self._hung[cls]) for name, cls in classes if cls in self._hung]
+        if hung:
+            hung_classes = {cls for _, cls, _ in hung}
+            classes = [(name, cls) for name, cls in classes if cls not in hung_classes]
+            now = time.perf_counter()
+            for name, cls, began in hung:
+                yield name, cls, None, now - began
+        if not classes:
+            return
+        todo = collections.deque(classes)
+        results = queue.SimpleQueue()
+        lock = threading.Lock()
+        running = {}        # 워커 번호 → (name, cls, 시작 시각)
+        abandoned = set()   # 제한 시간을 넘겨 버린 워커 번호
+        workers = itertools.count()
+
+        def work(worker):
+            while True:
+                with lock:
+                    if not todo:
+                        return
+                    name, cls = todo.popleft()
+                    began = time.perf_counter()
+                    running[worker] = (name, cls, began)
+                entry = describe(cls)
+                seconds = time.perf_counter() - began
+                with lock:
+                    if worker in abandoned:
+                        with self._hung_lock:
+                            self._hung.pop(cls, None)
+                        return
+                    del running[worker]
+                results.put((name, cls, entry, seconds))
+
+        def spawn():
+            worker = next(workers)
+            threading.Thread(target=work, args=(worker,), name=f"graph-catalog-{worker}", daemon=True).start()
+
+        for _ in range(min(CATALOG_WORKERS, len(classes))):
+            spawn()
+        remaining = len(classes)
+        try:
+            while remaining:
+                try:
+                    result = results.get(timeout=_POLL_SECONDS)
+                except queue.Empty:
+                    result = None
+                if result is not None:
+                    remaining -= 1
+                    yield result
+                now = time.perf_counter()
+                with lock:
+                    stuck = [(worker, task) for worker, task in running.items() if now - task[2] > INPUT_TYPES_TIMEOUT]
+                    for worker, (_, cls, began) in stuck:
+                        abandoned.add(worker)
+                        del running[worker]
+                        with self._hung_lock:
+                            self._hung[cls] = began
+                for _, (name, cls, began) in stuck:
+                    remaining -= 1
+                    spawn()
+                    yield name, cls, None, now - began
+        finally:
+            # 중간에 멈추면 남은 워커가 대기 중인 클래스를 더 집지 않게 한다
+            with lock:
+                todo.clear()
+
+    def input_types(self, name):
+        """빌드된 카탈로그에 있는 노드 타입의 INPUT_TYPES 결과. 없거나 실패한 클래스면 None."""
+        entry = self._entries.get(name)
+        if entry is None or not entry["ok"]:
+            return None
+        return entry["input"]
+
+    def view(self, name, category_filter=None):
+        """빌드된 카탈로그의 node_types/all_nodes 뷰. category_filter는 정규식.
+
+        category_filter가 없으면 캐시된 JSON 문자열을 반환한다.
+        """
+        entry_view = _VIEWS[name]
+        entries, views = self._entries, self._views
+        if category_filter:
+            return {
+                node: entry_view(entry) for node, entry in entries.items()
+                if re.search(category_filter, entry["category"])
+            }
+        if name not in views:
+            views[name] = json.dumps({node: entry_view(entry) for node, entry in entries.items()})
+        return views[name]
+
+    async def ensure(self, mappings, refresh=False):
+        """이벤트 루프를 막지 않고 카탈로그를 준비한다. 이미 최신이면 바로 반환한다."""
+        if refresh or not self.is_current(mappings) or self._models_check_due():
+            loop = asyncio.get_running_loop()
+            await loop.run_in_executor(None, self.build, mappings, refresh)
+
+    def status(self):
+        return {
+            "classes": len(self._entries),
+            "fingerprint": self.fingerprint,
+            "built_at": self.built_at,
+            "build_seconds": self.build_seconds,
+            "source": self.source,
+        }
+
+    def stats(self, limit=20):
+        """클래스별/노드 팩별 INPUT_TYPES 비용. 느린 순으로 정렬한다."""
+        costs = self.costs
+        packs = {}
+        for name, cost in costs.items():
+            pack = packs.setdefault(cost["pack"], {
+                "pack": cost["pack"], "classes": 0, "seconds": 0.0, "timeouts": 0, "errors": 0, "cached": 0,
+            })
+            pack["classes"] += 1
+            pack["seconds"] += cost["seconds"]
+            pack["timeouts"] += cost["status"] == "timeout"
+            pack["errors"] += cost["status"] == "error"
+            pack["cached"] += cost["cached"]
+        slowest = sorted(costs.items(), key=lambda item: item[1]["seconds"], reverse=True)[:limit]
+        return {
+            "build_seconds": self.build_seconds,
+            "classes": len(costs),
+            "timeouts": sum(cost["status"] == "timeout" for cost in costs.values()),
+            "errors": sum(cost["status"] == "error" for cost in costs.values()),
+            "cached": sum(cost["cached"] for cost in costs.values()),
+            "packs": sorted(packs.values(), key=lambda pack: pack["seconds"], reverse=True),
+            "slowest": [dict(cost, name=name) for name, cost in slowest],
+        }
+
+
+def _location(cls):
+    return f"{getattr(cls, '__module__', '')}.{getattr(cls, '__qualname__', '')}"
+
+
+catalog = NodeCatalog(shared=shared_cache("catalog"))
+
+
+def install_warmup(app):
+    """WARMUP_MODE가 background면 서버 시작 후 카탈로그를 백그라운드에서 빌드하도록 등록한다.
+
+    커스텀 노드가 모두 로드된 뒤(서버 시작 시점)에 빌드해야 하므로 app.on_startup을 쓴다.
+    시작을 지연시키지 않도록 빌드 완료를 기다리지 않는다.
+    """
+    if WARMUP_MODE != "background":
+        return
+
+    async def warm_catalog(app):
+        loop = asyncio.get_running_loop()
+        future = loop.run_in_executor(None, catalog.build, node_class_mappings())
+        future.add_done_callback(_log_warmup_failure)
+
+    app.on_startup.append(warm_catalog)
+
+
+def _log_warmup_failure(future):
+    if future.exception() is not None:
+        logger.warning("[GraphControlEndpoint] 카탈로그 워밍업 실패: %s", future.exception())
+
+
+routes = web.RouteTableDef()
+
+
+@routes.get("/comfy/graph/catalog/stats")
+@instrument
+async def get_catalog_stats(request):
+    """마지막 카탈로그 빌드의 클래스별/노드 팩별 INPUT_TYPES 비용을 반환한다."""
+    try:
+        limit = int(request.query.get("limit", "20"))
+    except ValueError:
+        return web.json_response({"error": "limit must be an integer"}, status=400)
+    return web.json_response(catalog.stats(limit))
+
+
+# 서버에 라우트 등록
+PromptServer.instance.app.router.add_routes(routes)
@@ -4,19 +4,203 @@ import asyncio
 import json
 import os
 import re
-import sys
+import uuid
+from collections import deque
 
 import aiohttp
 from aiohttp import web
 from server import PromptServer
 
+from .graph_cache import SHARED_CACHE_DIR, GraphFileCache, shared_cache
+from .graph_catalog import WARMUP_MODE, catalog, node_class_mappings
+from .graph_journal import JOURNAL_SPILL_PATH, CommandJournal, JournalError
+from .graph_metrics import instrument, metrics, read_json, type_label
+
 SAVE_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), "saved_graphs")
 
+PROMPT_URL = "http://127.0.0.1:8188/prompt"
+
+# 에디터 탭이 없을 때 graph_command 처리 방식:
+# "buffer" — 큐에 보관했다가 에디터가 연결되면 한 번의 batch로 전송, "fail" — 즉시 503
+OFFLINE_POLICY = os.environ.get("GRAPH_CONTROL_OFFLINE_POLICY", "buffer")
+OFFLINE_BUFFER_SIZE = 1000
+
+# graph_id 없는 요청이 쓰는 워크스페이스와 동시에 둘 수 있는 워크스페이스 수
+DEFAULT_GRAPH_ID = "default"
+MAX_WORKSPACES = 64
+GRAPH_ID_PATTERN = re.compile(r"^[A-Za-z0-9_.-]{1,64}$")
+
+# 프론트엔드가 위젯으로 만드는 입력 타입 (그 외 타입은 소켓 입력)
+WIDGET_TYPES = ("INT", "FLOAT", "STRING", "BOOLEAN", "COMBO")
+
+
+def widget_names(node_type):
+    """노드 타입의 widgets_values 순서에 대응하는 위젯 이름 목록을 반환한다.
+
+    카탈로그에 빌드된 INPUT_TYPES를 프론트엔드와 같은 규칙으로 훑는다. seed류 INT 위젯
+    뒤에는 control_after_generate 값이 한 칸 더 직렬화되므로 None 자리를 끼워 넣는다.
+    명령 경로(저널 미러)에서도 불리므로 INPUT_TYPES()를 직접 호출하지 않는다. 카탈로그에
+    없는 노드 타입이면 None을 반환한다.
+    """
+    input_types = catalog.input_types(node_type)
+    if input_types is None:
+        return None
+
+    names = []
+    for section in ("required", "optional"):
+        for key, val in input_types.get(section, {}).items():
+            spec = val if isinstance(val, (list, tuple)) else (val,)
+            type_name = spec[0] if spec else None
+            options = spec[1] if len(spec) > 1 and isinstance(spec[1], dict) else {}
+            if options.get("forceInput"):
+                continue
+            if not isinstance(type_name, (list, tuple)) and type_name not in WIDGET_TYPES:
+                continue
+            names.append(key)
+            if type_name == "INT" and (
+                options.get("control_after_generate") or key in ("seed", "noise_seed")
+            ):
+                names.append(None)
+    return names
+
+
+def _http_error(exc_class, message):
+    return exc_class(text=json.dumps({"error": message}), content_type="application/json")
 
-def _get_node_class_mappings():
-    """ComfyUI의 NODE_CLASS_MAPPINGS를 반환한다."""
-    nodes_mod = sys.modules.get("nodes")
-    return getattr(nodes_mod, "NODE_CLASS_MAPPINGS", {})
+
+def _offline_error(message):
+    return _http_error(web.HTTPServiceUnavailable, message)
+
+
+class EditorPresence:
+    """graph_control.js가 로드된 에디터 탭을 추적하고, 미연결 시 명령을 버퍼링한다.
+
+    에디터는 ComfyUI WS의 client_id(sid)로 등록하며, 연결 여부는
+    PromptServer.instance.sockets에 그 sid가 남아 있는지로 판단한다.
+    """
+
+    def __init__(self):
+        self._editors = set()
+        self._buffer = deque()
+
+    def register(self, client_id):
+        """에디터를 등록하고 그동안 버퍼링된 명령을 꺼내 반환한다.
+
+        연결이 끊긴 이전 에디터 sid는 이때 정리한다.
+        """
+        sockets = getattr(PromptServer.instance, "sockets", None) or {}
+        self._editors = {sid for sid in self._editors if sid in sockets}
+        self._editors.add(client_id)
+        buffered = list(self._buffer)
+        self._buffer.clear()
+        return buffered
+
+    def editors(self):
+        """현재 연결되어 있는 에디터 client_id 목록."""
+        sockets = getattr(PromptServer.instance, "sockets", None) or {}
+        return [client_id for client_id in self._editors if client_id in sockets]
+
+    def is_connected(self):
+        """연결된 에디터가 하나라도 있으면 True."""
+        return bool(self.editors())
+
+    @property
+    def buffered(self):
+        """버퍼링된 명령 수."""
+        return len(self._buffer)
+
+    def admit(self, count=1):
+        """count개의 graph_command를 보낼 수 있는지 확인한다. 에디터가 없으면 True.
+
+        fail 정책이거나 버퍼가 가득 차면 503 예외를 던진다.
+        """
+        if self.is_connected():
+            return False
+        if OFFLINE_POLICY == "fail":
+            raise _offline_error("no editor connected")
+        if len(self._buffer) + count > OFFLINE_BUFFER_SIZE:
+            raise _offline_error("no editor connected: offline buffer full")
+        return True
+
+    def hold(self, data):
+        """에디터 연결 전까지 명령을 보관한다."""
+        self._buffer.append(data)
+
+
+async def broadcast(data, event="graph_command", record=True, workspace=None, produce=None):
+    """워크스페이스의 에디터 탭에 이벤트를 보내고 보낸 데이터를 반환한다.
+
+    graph_command는 저널에 기록되어 seq가 붙는다. 이미 기록된 명령은 record=False로 보낸다.
+    produce를 주면 data 대신 send_lock 안에서 produce()가 만든 데이터(이미 기록된 것)를
+    보낸다. undo/redo처럼 저널을 바꿔 seq를 받는 작업은 이렇게 전송과 같은 잠금 안에서 한다.
+    에디터가 연결되어 있지 않으면 OFFLINE_POLICY에 따라 버퍼링하거나 503을 던진다.
+    workspace를 생략하면 기본 워크스페이스로 보낸다.
+    """
+    workspace = workspace or workspaces.default
+    # 기록과 전송을 한 번에 묶어 브라우저가 seq 순서대로 받게 한다
+    async with workspace.send_lock:
+        offline = workspace.presence.admit() if event == "graph_command" else False
+        if produce is not None:
+            data = produce()
+            record = False
+        return await _send_locked(workspace, data, event, record, offline)
+
+
+async def broadcast_all(commands, workspace=None):
+    """graph_command 여러 개를 순서대로 보낸다. 보낼 수 없으면 하나도 기록하지 않고 503.
+
+    확인과 기록/버퍼링을 send_lock 한 번 안에서 하므로 배치가 일부만 버퍼링되지 않는다.
+    에디터가 없어 버퍼링되었으면 True를 반환한다.
+    """
+    workspace = workspace or workspaces.default
+    async with workspace.send_lock:
+        offline = workspace.presence.admit(len(commands))
+        for cmd in commands:
+            await _send_locked(workspace, cmd, "graph_command", True, offline)
+    return offline
+
+
+async def _send_locked(workspace, data, event, record, offline):
+    # send_lock을 잡은 상태에서 호출한다
+    if event == "graph_command":
+        workspace.invalidate_reads()
+        if record:
+            data = workspace.journal.record(data)
+        if offline:
+            workspace.presence.hold(data)
+            return data
+    with metrics.time("graph_send_seconds", event=event):
+        for client_id in workspace.presence.editors():
+            await PromptServer.instance.send(event, data, client_id)
+    return data
+
+
+_http_session = None
+_http_session_loop = None
+
+
+def http_session():
+    """/prompt 제출에 재사용하는 ClientSession. 첫 사용 시 현재 루프에 만든다."""
+    global _http_session, _http_session_loop
+    loop = asyncio.get_running_loop()
+    if _http_session is None or _http_session.closed is not False or _http_session_loop is not loop:
+        _http_session = aiohttp.ClientSession()
+        _http_session_loop = loop
+    return _http_session
+
+
+async def close_http_session(app=None):
+    """공유 ClientSession을 닫는다 (앱 종료 시)."""
+    global _http_session
+    if _http_session is not None and _http_session.closed is False:
+        await _http_session.close()
+    _http_session = None
+
+
+async def queue_prompt(prompt):
+    """prompt를 ComfyUI /prompt에 제출하고 응답 JSON을 반환한다."""
+    async with http_session().post(PROMPT_URL, json={"prompt": prompt}) as resp:
+        return await resp.json()
 
 
 class StateStore:
@@ -46,31 +230,133 @@ class StateStore:
         return self._results.pop(request_id, None)
 
 
+class Workspace:
+    """graph_id로 구분되는 독립 그래프 (에디터 탭 하나 이상).
+
+    pending 요청 저장소, 명령 저널, 에디터 presence와 전송 락을 각자 가지므로
+    한 워크스페이스의 요청이 다른 워크스페이스를 기다리게 하지 않는다.
+    """
+
+    def __init__(self, graph_id, state_store=None, journal=None, presence=None):
+        self.graph_id = graph_id
+        self.state_store = state_store or StateStore()
+        self.journal = journal or CommandJournal(
+            spill_path=_workspace_spill_path(graph_id), resolve_widgets=widget_names,
+        )
+        self.presence = presence or EditorPresence()
+        self.send_lock = asyncio.Lock()
+        # 읽기 요청 single-flight와 최근 결과 (ws/graph_ws.py가 사용)
+        self.reads = {}         # 읽기 키 → 진행 중 Task
+        self.read_cache = {}    # 읽기 키 → (time.monotonic(), 결과)
+        self.read_generation = 0
+
+    def invalidate_reads(self):
+        """그래프가 바뀌었으므로 최근 읽기 결과를 버리고 진행 중인 읽기에 새 요청이 합류하지 않게 한다."""
+        self.reads.clear()
+        self.read_cache.clear()
+        self.read_generation += 1
+
+    def summary(self):
+        return {
+            "graph_id": self.graph_id,
+            "editors": len(self.presence.editors()),
+            "buffered": self.presence.buffered,
+            "seq": self.journal.seq,
+            "pending": len(self.state_store._pending),
+        }
+
+
+def _workspace_spill_path(graph_id):
+    """워크스페이스별 저널 spill 파일 경로. 설정이 없으면 ""(spill 안 함)."""
+    if not JOURNAL_SPILL_PATH:
+        return ""
+    root, ext = os.path.splitext(JOURNAL_SPILL_PATH)
+    return f"{root}.{graph_id}{ext}"
+
+
+class WorkspaceRegistry:
+    """graph_id → Workspace. 기본 워크스페이스는 항상 존재한다."""
+
+    def __init__(self, default):
+        self.default = default
+        self._workspaces = {default.graph_id: default}
+
+    def get(self, graph_id=None, create=True):
+        """graph_id의 워크스페이스를 반환한다. 없으면 create에 따라 만들거나 None.
+
+        graph_id 형식이 잘못되었거나 워크스페이스 수가 한도를 넘으면 ValueError.
+        """
+        if graph_id is None:
+            return self.default
+        if not isinstance(graph_id, str) or not GRAPH_ID_PATTERN.match(graph_id):
+            raise ValueError(f"invalid graph_id: {graph_id!r}")
+        workspace = self._workspaces.get(graph_id)
+        if workspace is None and create:
+            if len(self._workspaces) >= MAX_WORKSPACES:
+                raise ValueError("too many workspaces")
+            workspace = self._workspaces[graph_id] = Workspace(graph_id)
+        return workspace
+
+    def remove(self, graph_id):
+        """워크스페이스를 삭제한다. 기본 워크스페이스는 삭제할 수 없다."""
+        if graph_id == self.default.graph_id:
+            return False
+        return self._workspaces.pop(graph_id, None) is not None
+
+    def __iter__(self):
+        return iter(list(self._workspaces.values()))
+
+
+graph_files = GraphFileCache(shared=shared_cache("graphs", shards=4))
 state_store = StateStore()
+journal = CommandJournal(resolve_widgets=widget_names)
+editor_presence = EditorPresence()
+workspaces = WorkspaceRegistry(Workspace(DEFAULT_GRAPH_ID, state_store, journal, editor_presence))
+
+
+def workspace_for(graph_id, create=True):
+    """요청의 graph_id에 해당하는 워크스페이스. 잘못된 id면 400, create=False이고 없으면 404."""
+    try:
+        workspace = workspaces.get(graph_id, create=create)
+    except ValueError as e:
+        raise _http_error(web.HTTPBadRequest, str(e))
+    if workspace is None:
+        raise _http_error(web.HTTPNotFound, f"unknown graph_id: {graph_id}")
+    return workspace
+
+
+metrics.register_gauge(
+    "graph_ws_inflight", "브라우저 응답을 기다리는 WS 요청 수",
+    lambda: sum(len(workspace.state_store._pending) for workspace in workspaces),
+)
 
 routes = web.RouteTableDef()
 
 
 @routes.post("/comfy/graph/command")
+@instrument
 async def post_command(request):
     """단일 그래프 명령을 브라우저에 브로드캐스트한다."""
     try:
-        data = await request.json()
+        data = await read_json(request)
     except Exception:
         return web.json_response({"error": "invalid JSON"}, status=400)
 
     if "type" not in data:
         return web.json_response({"error": "missing field: type"}, status=400)
 
-    await PromptServer.instance.send("graph_command", data)
-    return web.json_response({"ok": True})
+    workspace = workspace_for(data.pop("graph_id", None))
+    offline = not workspace.presence.is_connected()
+    sent = await broadcast(data, workspace=workspace)
+    return web.json_response({"ok": True, "seq": sent["seq"], "buffered": offline})
 
 
 @routes.post("/comfy/graph/batch")
+@instrument
 async def post_batch(request):
     """여러 그래프 명령을 순서대로 브로드캐스트한다."""
     try:
-        data = await request.json()
+        data = await read_json(request)
     except Exception:
         return web.json_response({"error": "invalid JSON"}, status=400)
 
@@ -80,108 +366,203 @@ async def post_batch(request):
     if not isinstance(commands, list):
         return web.json_response({"error": "commands must be a list"}, status=400)
 
-    count = 0
+    workspace = workspace_for(data.get("graph_id"))
+    valid = []
     errors = []
     for i, cmd in enumerate(commands):
         if not isinstance(cmd, dict) or "type" not in cmd:
             errors.append({"index": i, "error": "missing field: type"})
             continue
-        await PromptServer.instance.send("graph_command", cmd)
-        count += 1
+        valid.append(cmd)
 
-    return web.json_response({"ok": True, "count": count, "errors": errors})
+    offline = await broadcast_all(valid, workspace=workspace)
+
+    return web.json_response({"ok": True, "count": len(valid), "errors": errors, "buffered": offline})
 
 
 @routes.get("/comfy/graph/node_types")
+@instrument
 async def get_node_types(request):
-    """등록된 노드 타입과 입출력 정보를 반환한다."""
+    """등록된 노드 타입과 입출력 정보를 반환한다. ?refresh=1이면 카탈로그를 다시 빌드한다."""
     category_filter = request.query.get("category")
-    mappings = _get_node_class_mappings()
-    result = {}
-
-    for name, cls in mappings.items():
+    if category_filter:
         try:
-            cat = getattr(cls, "CATEGORY", "")
-            if category_filter and not re.search(category_filter, cat):
-                continue
-
-            input_types = {}
-            if hasattr(cls, "INPUT_TYPES"):
-                input_types = cls.INPUT_TYPES()
+            re.compile(category_filter)
+        except re.error:
+            return web.json_response({"error": "invalid category pattern"}, status=400)
+    await catalog.ensure(node_class_mappings(), refresh=request.query.get("refresh") == "1")
 
-            output_types = list(getattr(cls, "RETURN_TYPES", ()))
-
-            result[name] = {
-                "input": input_types,
-                "output": output_types,
-                "category": cat,
-            }
-        except Exception:
-            result[name] = {"input": {}, "output": [], "category": ""}
-
-    return web.json_response(result)
+    if category_filter:
+        return web.json_response(catalog.view("node_types", category_filter))
+    return web.Response(text=catalog.view("node_types"), content_type="application/json")
 
 
 @routes.get("/comfy/graph/all_nodes")
+@instrument
 async def get_all_nodes(request):
     """전체 노드 타입 이름 + 설명 + 카테고리를 반환한다. AI 컨텍스트용."""
-    mappings = _get_node_class_mappings()
-    result = {}
-
-    for name, cls in mappings.items():
-        try:
-            description = getattr(cls, "DESCRIPTION", "")
-            if not description:
-                description = (cls.__doc__ or "").strip()
-
-            cat = getattr(cls, "CATEGORY", "")
-            output_types = list(getattr(cls, "RETURN_TYPES", ()))
-
-            input_names = []
-            if hasattr(cls, "INPUT_TYPES"):
-                input_types = cls.INPUT_TYPES()
-                for section in ("required", "optional"):
-                    if section in input_types:
-                        for key, val in input_types[section].items():
-                            type_name = val[0] if isinstance(val, (list, tuple)) else str(val)
-                            input_names.append({"name": key, "type": type_name})
-
-            result[name] = {
-                "description": description,
-                "category": cat,
-                "inputs": input_names,
-                "outputs": output_types,
-            }
-        except Exception:
-            result[name] = {"description": "", "category": "", "inputs": [], "outputs": []}
-
-    return web.json_response(result)
+    await catalog.ensure(node_class_mappings(), refresh=request.query.get("refresh") == "1")
+    return web.Response(text=catalog.view("all_nodes"), content_type="application/json")
+
+
+@routes.get("/comfy/graph/status")
+@instrument
+async def get_status(request):
+    """워밍업 상태를 반환한다. warm은 현재 노드 구성의 카탈로그가 준비되었는지를 뜻한다."""
+    return web.json_response({
+        "warm": catalog.is_current(node_class_mappings()),
+        "warmup": WARMUP_MODE,
+        "catalog": catalog.status(),
+        "http_session": _http_session is not None and _http_session.closed is False,
+        "shared_cache": SHARED_CACHE_DIR or None,
+    })
 
 
 @routes.post("/comfy/graph/state")
+@instrument
 async def post_state(request):
     """브라우저에서 WS 요청 결과를 수신한다 (내부용)."""
     try:
-        data = await request.json()
+        data = await read_json(request)
     except Exception:
         return web.json_response({"error": "invalid JSON"}, status=400)
 
     request_id = data.get("request_id")
     result_data = data.get("data")
 
+    # 브라우저가 측정한 적용 시간 (ms)
+    apply_ms = data.get("apply_ms")
+    if isinstance(apply_ms, (int, float)):
+        metrics.observe("graph_browser_apply_seconds", apply_ms / 1000.0, type=type_label(data.get("type")))
+
+    workspace = workspace_for(data.get("graph_id"))
     if request_id:
-        state_store.resolve_pending(request_id, result_data)
+        workspace.state_store.resolve_pending(request_id, result_data)
     else:
-        state_store.last_state = result_data
+        workspace.state_store.last_state = result_data
+        workspace.invalidate_reads()
+        if isinstance(result_data, dict):
+            workspace.journal.sync(result_data)
 
     return web.json_response({"ok": True})
 
 
+@routes.post("/comfy/graph/presence")
+@instrument
+async def post_presence(request):
+    """에디터 탭을 등록하고 버퍼링된 명령을 한 번의 batch로 전송한다 (내부용)."""
+    try:
+        data = await read_json(request)
+    except Exception:
+        return web.json_response({"error": "invalid JSON"}, status=400)
+
+    client_id = data.get("client_id")
+    if not client_id:
+        return web.json_response({"error": "missing field: client_id"}, status=400)
+
+    workspace = workspace_for(data.get("graph_id"))
+    async with workspace.send_lock:
+        buffered = workspace.presence.register(client_id)
+        if buffered:
+            with metrics.time("graph_send_seconds", event="graph_command"):
+                await PromptServer.instance.send("graph_command", {"type": "batch", "commands": buffered}, client_id)
+
+    return web.json_response({"ok": True, "flushed": len(buffered)})
+
+
+@routes.get("/comfy/graph/presence")
+@instrument
+async def get_presence(request):
+    """에디터 연결 여부와 버퍼링된 명령 수를 반환한다."""
+    presence = workspace_for(request.query.get("graph_id"), create=False).presence
+    editors = presence.editors()
+    return web.json_response({
+        "connected": bool(editors),
+        "editors": len(editors),
+        "buffered": presence.buffered,
+        "policy": OFFLINE_POLICY,
+    })
+
+
+@routes.get("/comfy/graph/workspaces")
+@instrument
+async def get_workspaces(request):
+    """워크스페이스 목록과 각 에디터/버퍼/저널/pending 상태를 반환한다."""
+    return web.json_response([workspace.summary() for workspace in workspaces])
+
+
+@routes.delete("/comfy/graph/workspace/{graph_id}")
+@instrument
+async def delete_workspace(request):
+    """워크스페이스를 삭제한다. 저널과 오프라인 버퍼도 함께 버려진다."""
+    graph_id = request.match_info["graph_id"]
+    if graph_id == DEFAULT_GRAPH_ID:
+        return web.json_response({"error": "cannot delete the default workspace"}, status=400)
+    if not workspaces.remove(graph_id):
+        return web.json_response({"error": "workspace not found"}, status=404)
+    return web.json_response({"ok": True})
+
+
+@routes.post("/comfy/graph/undo")
+@instrument
+async def post_undo(request):
+    """저널의 마지막 명령을 되돌리는 역명령을 브로드캐스트한다."""
+    workspace = workspace_for(request.query.get("graph_id"), create=False)
+    # 전송 가능 여부 확인, 저널 변경, 전송을 send_lock 한 번 안에서 한다
+    try:
+        command = await broadcast(None, workspace=workspace, produce=workspace.journal.undo)
+    except JournalError as e:
+        return web.json_response({"error": str(e)}, status=409)
+
+    return web.json_response({"ok": True, "seq": command["seq"], "command": command})
+
+
+@routes.post("/comfy/graph/redo")
+@instrument
+async def post_redo(request):
+    """마지막으로 되돌린 명령을 다시 브로드캐스트한다."""
+    workspace = workspace_for(request.query.get("graph_id"), create=False)
+    # 전송 가능 여부 확인, 저널 변경, 전송을 send_lock 한 번 안에서 한다
+    try:
+        command = await broadcast(None, workspace=workspace, produce=workspace.journal.redo)
+    except JournalError as e:
+        return web.json_response({"error": str(e)}, status=409)
+
+    return web.json_response({"ok": True, "seq": command["seq"], "command": command})
+
+
+@routes.get("/comfy/graph/journal")
+@instrument
+async def get_journal(request):
+    """since 이후의 저널 명령을 반환한다. 재연결한 브라우저의 catch-up용.
+
+    epoch가 현재 저널과 다르거나 since가 현재 seq보다 크면(서버 재시작) 410을 반환한다.
+    """
+    try:
+        since = int(request.query.get("since", "0"))
+    except ValueError:
+        return web.json_response({"error": "since must be an integer"}, status=400)
+
+    journal = workspace_for(request.query.get("graph_id"), create=False).journal
+    epoch = request.query.get("epoch")
+    if (epoch and epoch != journal.epoch) or since > journal.seq:
+        return web.json_response({"error": "journal reset", "seq": journal.seq, "epoch": journal.epoch}, status=410)
+    entries = journal.since(since)
+    if entries is None:
+        return web.json_response({"error": "journal truncated", "seq": journal.seq, "epoch": journal.epoch}, status=410)
+    return web.json_response({
+        "seq": journal.seq,
+        "epoch": journal.epoch,
+        "commands": [entry["command"] for entry in entries],
+    })
+
+
 @routes.post("/comfy/graph/queue")
+@instrument
 async def post_queue(request):
     """prompt를 ComfyUI 실행 큐에 전달한다."""
     try:
-        data = await request.json()
+        data = await read_json(request)
     except Exception:
         return web.json_response({"error": "invalid JSON"}, status=400)
 
@@ -189,30 +570,47 @@ async def post_queue(request):
     if not prompt:
         return web.json_response({"error": "missing field: prompt"}, status=400)
 
-    async with aiohttp.ClientSession() as session:
-        async with session.post(
-            "http://127.0.0.1:8188/prompt",
-            json={"prompt": prompt},
-        ) as resp:
-            result = await resp.json()
-
+    result = await queue_prompt(prompt)
     return web.json_response({"ok": True, "prompt_id": result.get("prompt_id")})
 
 
+async def _request_graph(workspace):
+    # ws.graph_ws가 이 모듈을 가져오므로 호출 시점에 가져온다
+    if "." in (__package__ or ""):
+        from ..ws.graph_ws import process_ws_request
+    else:
+        from ws.graph_ws import process_ws_request
+    return await process_ws_request({
+        "request_id": str(uuid.uuid4()),
+        "type": "get_graph",
+        "graph_id": workspace.graph_id,
+    })
+
+
+def _write_graph_file(filepath, content, graph):
+    os.makedirs(os.path.dirname(filepath), exist_ok=True)
+    with open(filepath, "wb") as f:
+        f.write(content)
+    graph_files.store(filepath, content, graph)
+
+
 @routes.post("/comfy/graph/save")
+@instrument
 async def post_save(request):
-    """그래프를 JSON 파일로 저장한다."""
+    """그래프를 JSON 파일로 저장한다.
+
+    graph 없이 graph_id만 주면 그 워크스페이스 브라우저에 get_graph를 요청해 현재 그래프를 저장한다.
+    """
     try:
-        data = await request.json()
+        data = await read_json(request)
     except Exception:
         return web.json_response({"error": "invalid JSON"}, status=400)
 
     filename = data.get("filename")
     graph = data.get("graph")
-
     if not filename:
         return web.json_response({"error": "missing field: filename"}, status=400)
-    if graph is None:
+    if graph is None and data.get("graph_id") is None:
         return web.json_response({"error": "missing field: graph"}, status=400)
 
     # 경로 탐색 방지
@@ -220,19 +618,30 @@ async def post_save(request):
     if safe_name != filename:
         return web.json_response({"error": "invalid filename: path traversal"}, status=400)
 
-    os.makedirs(SAVE_DIR, exist_ok=True)
+    if graph is None:
+        # last_state는 마지막 /state 회신일 뿐이라 그 뒤의 명령이 빠져 있을 수 있다
+        workspace = workspace_for(data["graph_id"], create=False)
+        result = await _request_graph(workspace)
+        if result.get("status") != "ok":
+            return web.json_response({"error": f"get_graph failed: {result.get('message')}"}, status=504)
+        graph = result.get("data") or {}
+
     filepath = os.path.join(SAVE_DIR, safe_name)
-    with open(filepath, "w") as f:
-        json.dump(graph, f)
+    content = json.dumps(graph).encode()
+    # 공유 캐시(SQLite)는 다른 워커의 잠금을 기다릴 수 있으므로 이벤트 루프 밖에서 쓴다
+    loop = asyncio.get_running_loop()
+    with metrics.time("graph_file_io_seconds", op="save"):
+        await loop.run_in_executor(None, _write_graph_file, filepath, content, graph)
 
     return web.json_response({"ok": True})
 
 
 @routes.post("/comfy/graph/load")
+@instrument
 async def post_load(request):
     """JSON 파일에서 그래프를 로드하고 브라우저에 전달한다."""
     try:
-        data = await request.json()
+        data = await read_json(request)
     except Exception:
         return web.json_response({"error": "invalid JSON"}, status=400)
 
@@ -246,16 +655,18 @@ async def post_load(request):
     if not os.path.exists(filepath):
         return web.json_response({"error": "file not found"}, status=404)
 
-    with open(filepath) as f:
-        graph_data = json.load(f)
+    loop = asyncio.get_running_loop()
+    with metrics.time("graph_file_io_seconds", op="load"):
+        graph_data = await loop.run_in_executor(None, graph_files.load, filepath)
 
-    await PromptServer.instance.send("graph_command", {
+    await broadcast({
         "type": "load_graph",
         "graph_data": graph_data,
-    })
+    }, workspace=workspace_for(data.get("graph_id")))
 
     return web.json_response({"ok": True, "graph": graph_data})
 
 
 # 서버에 라우트 등록 (app.router에 직접 추가해야 동작함)
 PromptServer.instance.app.router.add_routes(routes)
+PromptServer.instance.app.on_cleanup.append(close_http_session)
@@ -0,0 +1,206 @@
+"""HTTP 엔드포인트: /comfy/graph/sync 그래프 diff와 최소 패치 적용."""
+
+import uuid
+
+from aiohttp import web
+from server import PromptServer
+
+from .graph_catalog import catalog, node_class_mappings
+from .graph_control import broadcast, read_json, widget_names, workspace_for
+from .graph_metrics import instrument
+
+# ws/graph_ws.py와 같은 이유로 익스텐션 패키지 안에서는 상대 경로로 가져온다
+if "." in (__package__ or ""):
+    from ..ws.graph_ws import process_ws_request
+else:
+    from ws.graph_ws import process_ws_request
+
+
+def _iter_links(graph):
+    """워크플로 links를 (origin_id, origin_slot, target_id, target_slot) 튜플로 순회한다.
+
+    배열 형식 [id, origin_id, origin_slot, target_id, target_slot, type]과
+    객체 형식 {"origin_id", ...}을 모두 받는다.
+    """
+    for link in graph.get("links") or []:
+        if isinstance(link, dict):
+            yield (link["origin_id"], link["origin_slot"], link["target_id"], link["target_slot"])
+        elif isinstance(link, (list, tuple)) and len(link) >= 5:
+            yield (link[1], link[2], link[3], link[4])
+
+
+def _input_map(graph):
+    """(target_id, target_slot) → (origin_id, origin_slot). 입력 슬롯에는 링크가 하나뿐이다."""
+    return {(t_id, t_slot): (o_id, o_slot) for o_id, o_slot, t_id, t_slot in _iter_links(graph)}
+
+
+def _widget_commands(node_id, values, names, base=None):
+    """widgets_values 차이를 set_widget 명령으로 만든다. base가 None이면 전체 값을 설정한다."""
+    if isinstance(values, dict):
+        base = base if isinstance(base, dict) else {}
+        return [
+            {"type": "set_widget", "node_id": node_id, "name": name, "value": value}
+            for name, value in values.items()
+            if name not in base or base[name] != value
+        ]
+
+    commands = []
+    base = base if isinstance(base, list) else None
+    for index, value in enumerate(values or []):
+        if base is None:
+            if value is None:
+                continue
+        elif index < len(base) and base[index] == value:
+            continue
+        cmd = {"type": "set_widget", "node_id": node_id, "index": index, "value": value}
+        if names and index < len(names) and names[index]:
+            cmd["name"] = names[index]
+        commands.append(cmd)
+    return commands
+
+
+def _check_nodes(graph, field):
+    """graph의 nodes가 id를 가진 객체 목록인지 확인한다. 잘못되었으면 오류 메시지, 아니면 None."""
+    nodes = graph.get("nodes") or []
+    if not isinstance(nodes, list):
+        return f"{field}.nodes must be a list"
+    for i, node in enumerate(nodes):
+        if not isinstance(node, dict) or not isinstance(node.get("id"), (int, str)):
+            return f"{field}.nodes[{i}]: missing field: id"
+    return None
+
+
+def diff_graphs(current, target):
+    """current 그래프를 target과 같게 만드는 최소 명령 목록을 반환한다.
+
+    노드는 id로 대응시킨다. 타입이 바뀐 노드는 삭제 후 같은 id로 다시 만든다.
+    순서: 삭제 → 생성(+위젯) → 연결 해제 → 연결 → 위젯 변경 → 이동.
+    """
+    cur_nodes = {node["id"]: node for node in current.get("nodes") or []}
+    tgt_nodes = {node["id"]: node for node in target.get("nodes") or []}
+
+    removed = [nid for nid in cur_nodes if nid not in tgt_nodes]
+    recreated = [
+        nid for nid, node in tgt_nodes.items()
+        if nid in cur_nodes and cur_nodes[nid].get("type") != node.get("type")
+    ]
+    created = [nid for nid in tgt_nodes if nid not in cur_nodes]
+    fresh = set(recreated) | set(created)
+    gone = set(removed) | set(recreated)
+
+    names_cache = {}
+
+    def names_for(node):
+        node_type = node.get("type")
+        if node_type not in names_cache:
+            names_cache[node_type] = widget_names(node_type)
+        return names_cache[node_type]
+
+    commands = []
+    for nid in removed + recreated:
+        commands.append({"type": "remove_node", "node_id": nid})
+
+    for nid in recreated + created:
+        node = tgt_nodes[nid]
+        pos = node.get("pos") or [0, 0]
+        commands.append({
+            "type": "create_node",
+            "node_type": node.get("type"),
+            "node_id": nid,
+            "x": pos[0],
+            "y": pos[1],
+        })
+        commands.extend(_widget_commands(nid, node.get("widgets_values"), names_for(node)))
+
+    cur_inputs = _input_map(current)
+    tgt_inputs = _input_map(target)
+
+    for (t_id, t_slot), (o_id, _) in cur_inputs.items():
+        # 삭제되는 노드의 링크는 노드와 함께 사라진다
+        if t_id in gone or o_id in gone or (t_id, t_slot) in tgt_inputs:
+            continue
+        commands.append({"type": "disconnect", "node_id": t_id, "slot": t_slot})
+
+    for (t_id, t_slot), (o_id, o_slot) in tgt_inputs.items():
+        if cur_inputs.get((t_id, t_slot)) == (o_id, o_slot) and t_id not in fresh and o_id not in fresh:
+            continue
+        commands.append({
+            "type": "connect",
+            "from_id": o_id,
+            "from_slot": o_slot,
+            "to_id": t_id,
+            "to_slot": t_slot,
+        })
+
+    moves = []
+    for nid, node in tgt_nodes.items():
+        if nid in fresh:
+            continue
+        cur = cur_nodes[nid]
+        commands.extend(_widget_commands(
+            nid, node.get("widgets_values"), names_for(node), cur.get("widgets_values"),
+        ))
+        pos = node.get("pos")
+        if pos is not None and list(pos[:2]) != list((cur.get("pos") or [])[:2]):
+            moves.append({"type": "move_node", "node_id": nid, "x": pos[0], "y": pos[1]})
+    commands.extend(moves)
+
+    return commands
+
+
+routes = web.RouteTableDef()
+
+
+@routes.post("/comfy/graph/sync")
+@instrument
+async def post_sync(request):
+    """target 워크플로와 현재 그래프의 diff를 계산해 한 번의 batch로 적용한다."""
+    try:
+        data = await read_json(request)
+    except Exception:
+        return web.json_response({"error": "invalid JSON"}, status=400)
+
+    target = data.get("target")
+    if not isinstance(target, dict):
+        return web.json_response({"error": "missing field: target"}, status=400)
+
+    workspace = workspace_for(data.get("graph_id"))
+    current = data.get("current")
+    if current is None:
+        source = data.get("source", "browser")
+        if source == "mirror":
+            # 저널 미러는 보낸 명령까지 반영된 상태이므로 diff 기준으로 쓸 수 있다
+            if not workspace.journal.synced:
+                return web.json_response({"error": "no mirrored state"}, status=409)
+            current = workspace.journal.mirror.serialize()
+        elif source == "browser":
+            result = await process_ws_request({
+                "request_id": str(uuid.uuid4()),
+                "type": "get_graph",
+                "graph_id": workspace.graph_id,
+            })
+            if result.get("status") != "ok":
+                return web.json_response({"error": f"get_graph failed: {result.get('message')}"}, status=504)
+            current = result.get("data") or {}
+        else:
+            return web.json_response({"error": f"invalid source: {source}"}, status=400)
+    if not isinstance(current, dict):
+        return web.json_response({"error": "current must be an object"}, status=400)
+
+    for graph, field in ((target, "target"), (current, "current")):
+        error = _check_nodes(graph, field)
+        if error:
+            return web.json_response({"error": error}, status=400)
+
+    # 위젯 이름은 카탈로그에서 해석한다
+    await catalog.ensure(node_class_mappings())
+    commands = diff_graphs(current, target)
+
+    if commands and not data.get("dry_run"):
+        await broadcast({"type": "batch", "commands": commands}, workspace=workspace)
+
+    return web.json_response({"ok": True, "count": len(commands), "commands": commands})
+
+
+# 서버에 라우트 등록
+PromptServer.instance.app.router.add_routes(routes)
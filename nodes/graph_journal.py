@@ -0,0 +1,134 @@
+"""브라우저에 보낸 graph_command의 시퀀스 저널: undo/redo와 재연결 시 replay."""
+
+import json
+import os
+import uuid
+from collections import deque
+
+from .graph_model import GraphModel
+
+# 메모리에 보관하는 최대 저널 항목 수와 undo 깊이
+JOURNAL_MAX_ENTRIES = 1000
+
+# 설정하면 메모리에서 밀려난 항목을 이 파일(JSON Lines)에 이어 쓴다
+JOURNAL_SPILL_PATH = os.environ.get("GRAPH_CONTROL_JOURNAL_SPILL")
+
+
+class JournalError(Exception):
+    """undo/redo를 수행할 수 없을 때 발생한다."""
+
+
+class CommandJournal:
+    """append-only 명령 저널.
+
+    모든 명령에 seq를 붙여 기록하고, 서버측 미러(GraphModel)에 적용하면서
+    역명령을 계산해 undo 스택에 쌓는다. 미러가 브라우저 상태와 동기화되기
+    전(load_graph/clear_graph 또는 /state 수신 전)에는 역명령을 계산하지 않는다.
+
+    seq는 저널마다(프로세스가 재시작되면 다시) 1부터 시작하므로, 저널을 구분하는
+    epoch를 모든 명령에 함께 붙인다. 브라우저는 epoch가 바뀌면 seq 기준을 초기화한다.
+    """
+
+    def __init__(self, max_entries=None, spill_path=None, resolve_widgets=None):
+        self.max_entries = max_entries or JOURNAL_MAX_ENTRIES
+        self.spill_path = spill_path if spill_path is not None else JOURNAL_SPILL_PATH
+        self.seq = 0
+        self.epoch = uuid.uuid4().hex[:16]
+        self.mirror = GraphModel(resolve_widgets=resolve_widgets)
+        self.synced = False
+        self._entries = deque()   # {"seq", "command"}
+        self._undo = deque(maxlen=self.max_entries)   # (command, inverse)
+        self._redo = []
+        self._spill_started = False
+
+    def sync(self, graph):
+        """브라우저가 보고한 그래프로 미러를 맞춘다. 이전 undo/redo 이력은 버린다."""
+        self.mirror.configure(graph or {})
+        self.synced = True
+        self._undo.clear()
+        self._redo.clear()
+
+    def record(self, command, origin="command"):
+        """명령을 기록하고 seq가 붙은 명령을 반환한다.
+
+        origin이 "command"면 undo 스택에 쌓고 redo 스택을 비운다.
+        """
+        command = dict(command)
+        command.pop("seq", None)
+        command.pop("epoch", None)
+        # 재연결 replay 시 같은 id가 나오도록 생성 노드 id를 고정한다
+        if command.get("type") == "create_node" and command.get("node_id") is None and self.synced:
+            command["node_id"] = self.mirror.next_node_id()
+
+        inverse = self.mirror.apply(command, invert=self.synced)
+        if not self.synced:
+            inverse = None
+        if command.get("type") in ("load_graph", "clear_graph"):
+            self.synced = True
+
+        if origin == "command":
+            self._undo.append((command, inverse))
+            self._redo.clear()
+
+        self.seq += 1
+        command["seq"] = self.seq
+        command["epoch"] = self.epoch
+        self._entries.append({"seq": self.seq, "command": command})
+        while len(self._entries) > self.max_entries:
+            self._spill(self._entries.popleft())
+        return command
+
+    def undo(self):
+        """가장 최근 명령의 역명령을 기록하고 반환한다."""
+        if not self._undo:
+            raise JournalError("nothing to undo")
+        command, inverse = self._undo[-1]
+        if inverse is None:
+            raise JournalError("last command is not reversible")
+        self._undo.pop()
+        self._redo.append((command, inverse))
+        return self.record(inverse, origin="undo")
+
+    def redo(self):
+        """마지막으로 undo한 명령을 다시 기록하고 반환한다."""
+        if not self._redo:
+            raise JournalError("nothing to redo")
+        command, inverse = self._redo.pop()
+        self._undo.append((command, inverse))
+        return self.record(command, origin="redo")
+
+    def since(self, seq):
+        """seq 이후의 항목 목록을 반환한다.
+
+        이력이 잘려 이어 붙일 수 없거나, seq가 이 저널의 마지막 seq보다 크면(이전 프로세스의
+        seq) None.
+        """
+        if seq > self.seq:
+            return None
+        if seq == self.seq:
+            return []
+        oldest = self._entries[0]["seq"] if self._entries else self.seq + 1
+        entries = [entry for entry in self._entries if entry["seq"] > seq]
+        if seq + 1 >= oldest or oldest == 1:
+            return entries
+
+        if not self._spill_started or not os.path.exists(self.spill_path):
+            return None
+        spilled = []
+        with open(self.spill_path) as f:
+            for line in f:
+                entry = json.loads(line)
+                if entry["seq"] > seq:
+                    spilled.append(entry)
+        if not spilled or spilled[0]["seq"] != seq + 1:
+            return None
+        return spilled + entries
+
+    def _spill(self, entry):
+        if not self.spill_path:
+            return
+        # seq는 프로세스마다 1부터 시작하므로 이전 실행의 파일은 덮어쓴다
+        mode = "a" if self._spill_started else "w"
+        with open(self.spill_path, mode) as f:
+            f.write(json.dumps(entry) + "\n")
+        self._spill_started = True
@@ -0,0 +1,254 @@
+"""HTTP 엔드포인트: /comfy/graph/metrics Prometheus 텍스트 형식 지표."""
+
+import bisect
+import contextlib
+import functools
+import json
+import time
+from collections import deque
+
+from aiohttp import web
+from server import PromptServer
+
+# summary 분위수와 라벨 조합별로 보관하는 최근 샘플 수
+QUANTILES = (0.5, 0.95, 0.99)
+SAMPLE_WINDOW = 1024
+
+# type 라벨로 쓰는 명령/WS 요청 타입. 그 외 값은 "other"로 묶는다 (클라이언트 입력이 시계열을 늘리지 못하게)
+COMMAND_TYPES = frozenset((
+    "create_node", "remove_node", "connect", "disconnect", "set_widget",
+    "move_node", "clear_graph", "load_graph", "batch", "get_graph",
+))
+
+# 페이로드 크기 histogram 버킷 (bytes)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+
+
+class _Summary:
+    """최근 SAMPLE_WINDOW개 샘플로 분위수를 계산하는 summary. 정렬은 스크레이프 시에만 한다."""
+
+    def __init__(self):
+        self.samples = deque(maxlen=SAMPLE_WINDOW)
+        self.count = 0
+        self.total = 0.0
+
+    def observe(self, value):
+        self.samples.append(value)
+        self.count += 1
+        self.total += value
+
+
+class _Histogram:
+    """고정 버킷 histogram. 관측은 bisect 한 번이다."""
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.total = 0.0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.total += value
+
+
+def _format_labels(labels, extra=()):
+    items = list(labels) + list(extra)
+    if not items:
+        return ""
+    parts = []
+    for key, value in items:
+        value = str(value).replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+        parts.append(f'{key}="{value}"')
+    return "{" + ",".join(parts) + "}"
+
+
+class MetricsRegistry:
+    """카운터/summary/histogram 값을 보관하고 Prometheus 텍스트로 렌더링한다.
+
+    관측 비용은 dict 조회와 append 수준이며, 분위수 계산과 문자열 생성은
+    render() 호출(스크레이프) 시에만 일어난다.
+    """
+
+    def __init__(self):
+        self._defs = {}      # name → (kind, help, buckets)
+        self._values = {}    # name → {labels tuple: value/_Summary/_Histogram}
+        self._gauges = {}    # name → callable, 스크레이프 시 호출
+
+    def describe(self, name, kind, help_text, buckets=None):
+        """지표를 정의한다. kind는 counter/summary/histogram."""
+        self._defs[name] = (kind, help_text, buckets)
+        self._values.setdefault(name, {})
+
+    def register_gauge(self, name, help_text, fn):
+        """스크레이프 시점에 fn()으로 값을 읽는 gauge를 등록한다.
+
+        fn은 숫자 또는 {labels tuple: 숫자} dict를 반환한다.
+        """
+        self._defs[name] = ("gauge", help_text, None)
+        self._gauges[name] = fn
+
+    def inc(self, name, value=1, **labels):
+        series = self._values[name]
+        key = tuple(sorted(labels.items()))
+        series[key] = series.get(key, 0) + value
+
+    def observe(self, name, value, **labels):
+        series = self._values[name]
+        key = tuple(sorted(labels.items()))
+        metric = series.get(key)
+        if metric is None:
+            buckets = self._defs[name][2]
+            metric = _Histogram(buckets) if buckets else _Summary()
+            series[key] = metric
+        metric.observe(value)
+
+    @contextlib.contextmanager
+    def time(self, name, **labels):
+        """블록 실행 시간을 초 단위로 관측한다."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start, **labels)
+
+    def reset(self):
+        """관측 값을 모두 비운다. 정의와 gauge는 유지한다."""
+        for series in self._values.values():
+            series.clear()
+
+    def render(self):
+        """Prometheus 텍스트 형식(0.0.4)으로 렌더링한다."""
+        lines = []
+        for name, (kind, help_text, _) in self._defs.items():
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+
+            if kind == "gauge":
+                value = self._gauges[name]()
+                series = value if isinstance(value, dict) else {(): value}
+                for labels, v in series.items():
+                    lines.append(f"{name}{_format_labels(labels)} {v}")
+                continue
+
+            for labels, metric in self._values[name].items():
+                if kind == "counter":
+                    lines.append(f"{name}{_format_labels(labels)} {metric}")
+                elif kind == "summary":
+                    ordered = sorted(metric.samples)
+                    for q in QUANTILES:
+                        v = ordered[min(len(ordered) - 1, int(q * len(ordered)))] if ordered else float("nan")
+                        lines.append(f"{name}{_format_labels(labels, [('quantile', q)])} {v}")
+                    lines.append(f"{name}_sum{_format_labels(labels)} {metric.total}")
+                    lines.append(f"{name}_count{_format_labels(labels)} {metric.count}")
+                else:
+                    cumulative = 0
+                    for bound, n in zip(metric.buckets, metric.counts):
+                        cumulative += n
+                        lines.append(f"{name}_bucket{_format_labels(labels, [('le', bound)])} {cumulative}")
+                    lines.append(f"{name}_bucket{_format_labels(labels, [('le', '+Inf')])} {metric.count}")
+                    lines.append(f"{name}_sum{_format_labels(labels)} {metric.total}")
+                    lines.append(f"{name}_count{_format_labels(labels)} {metric.count}")
+        return "\n".join(lines) + "\n"
+
+
+metrics = MetricsRegistry()
+
+metrics.describe("graph_http_requests_total", "counter", "라우트/상태 코드별 HTTP 요청 수")
+metrics.describe("graph_http_request_seconds", "summary", "라우트별 HTTP 핸들러 처리 시간")
+metrics.describe("graph_http_request_bytes", "histogram", "라우트별 요청 본문 크기", SIZE_BUCKETS)
+metrics.describe("graph_http_response_bytes", "histogram", "라우트별 응답 본문 크기", SIZE_BUCKETS)
+metrics.describe("graph_json_parse_seconds", "summary", "라우트별 요청 JSON 파싱 시간")
+metrics.describe("graph_send_seconds", "summary", "이벤트별 PromptServer.send 소요 시간")
+metrics.describe("graph_ws_roundtrip_seconds", "summary", "WS 요청 타입별 브라우저 왕복 시간")
+metrics.describe("graph_ws_timeouts_total", "counter", "WS 요청 타입별 브라우저 응답 타임아웃 수")
+metrics.describe("graph_ws_coalesced_total", "counter", "브라우저 왕복 없이 처리된 WS 읽기 요청 수 (source=inflight/cache)")
+metrics.describe("graph_file_io_seconds", "summary", "저장/로드 파일 I/O 시간")
+metrics.describe("graph_browser_apply_seconds", "summary", "브라우저가 보고한 명령 타입별 적용 시간")
+metrics.describe("graph_catalog_build_seconds", "summary", "노드 카탈로그 빌드 시간")
+metrics.describe("graph_catalog_input_types_seconds", "summary", "노드 팩별 INPUT_TYPES 호출 시간")
+metrics.describe("graph_catalog_input_types_timeouts_total", "counter", "노드 팩별 INPUT_TYPES 타임아웃 수")
+
+
+def route_of(request):
+    """요청이 매칭된 라우트의 경로 템플릿을 반환한다 (라벨 카디널리티 억제)."""
+    route = request.match_info.route
+    resource = getattr(route, "resource", None)
+    return resource.canonical if resource is not None else request.path
+
+
+async def read_json(request):
+    """요청 본문을 JSON으로 파싱한다. 파싱 시간은 라우트별로 기록된다."""
+    body = await request.text()
+    with metrics.time("graph_json_parse_seconds", route=route_of(request)):
+        return json.loads(body)
+
+
+def type_label(value):
+    """명령/요청 타입을 type 라벨 값으로 바꾼다. 알 수 없는 타입은 "other"."""
+    return value if value in COMMAND_TYPES else "other"
+
+
+def instrument(handler):
+    """HTTP 핸들러의 요청 수, 처리 시간, 요청/응답 크기를 기록한다."""
+    @functools.wraps(handler)
+    async def wrapper(request):
+        start = time.perf_counter()
+        status = 500
+        response = None
+        try:
+            response = await handler(request)
+            status = response.status
+            return response
+        except web.HTTPException as e:
+            status = e.status
+            raise
+        finally:
+            route = route_of(request)
+            metrics.inc("graph_http_requests_total", route=route, status=str(status))
+            metrics.observe("graph_http_request_seconds", time.perf_counter() - start, route=route)
+            if request.content_length is not None:
+                metrics.observe("graph_http_request_bytes", request.content_length, route=route)
+            body = getattr(response, "body", None)
+            if isinstance(body, (bytes, bytearray)):
+                metrics.observe("graph_http_response_bytes", len(body), route=route)
+    return wrapper
+
+
+routes = web.RouteTableDef()
+
+
+@routes.get("/comfy/graph/metrics")
+async def get_metrics(request):
+    """수집된 지표를 Prometheus 텍스트 형식으로 반환한다."""
+    return web.Response(text=metrics.render(), content_type="text/plain", charset="utf-8")
+
+
+@routes.post("/comfy/graph/metrics/report")
+@instrument
+async def post_metrics_report(request):
+    """브라우저가 측정한 명령 적용 시간을 수신한다 (내부용)."""
+    try:
+        data = await read_json(request)
+    except Exception:
+        return web.json_response({"error": "invalid JSON"}, status=400)
+    if not isinstance(data, dict):
+        return web.json_response({"error": "body must be an object"}, status=400)
+
+    samples = data.get("samples")
+    if not isinstance(samples, list):
+        return web.json_response({"error": "samples must be a list"}, status=400)
+
+    count = 0
+    for sample in samples:
+        if not isinstance(sample, dict) or not isinstance(sample.get("ms"), (int, float)):
+            continue
+        metrics.observe("graph_browser_apply_seconds", sample["ms"] / 1000.0, type=type_label(sample.get("type")))
+        count += 1
+
+    return web.json_response({"ok": True, "count": count})
+
+
+# 서버에 라우트 등록
+PromptServer.instance.app.router.add_routes(routes)
@@ -0,0 +1,195 @@
+"""LiteGraph 그래프의 서버측 모델: graph_command 적용과 워크플로 직렬화."""
+
+import copy
+
+
+def _noop():
+    """아무 효과가 없었던 명령의 역명령."""
+    return {"type": "batch", "commands": []}
+
+
+def _connect_command(link):
+    return {"type": "connect", "from_id": link[1], "from_slot": link[2], "to_id": link[3], "to_slot": link[4]}
+
+
+class GraphModel:
+    """브라우저 LiteGraph와 같은 규칙으로 graph_command를 적용하는 그래프 모델.
+
+    노드는 {"id", "type", "pos", "widgets_values"} dict로, 링크는 워크플로 배열 형식
+    [id, origin_id, origin_slot, target_id, target_slot, type]으로 보관한다.
+    resolve_widgets(node_type)는 widgets_values 순서의 위젯 이름 목록을 반환하는
+    함수이며, set_widget의 name을 인덱스로 바꾸는 데 쓴다.
+    """
+
+    def __init__(self, graph=None, resolve_widgets=None):
+        self.resolve_widgets = resolve_widgets
+        self.configure(graph or {})
+
+    def configure(self, graph):
+        """직렬화된 워크플로로 상태를 교체한다."""
+        self.nodes = {}
+        self.links = {}
+        self._inputs = {}   # (target_id, target_slot) → link_id
+        for node in graph.get("nodes") or []:
+            node = copy.deepcopy(node)
+            node.setdefault("pos", [0, 0])
+            self.nodes[node["id"]] = node
+        for link in graph.get("links") or []:
+            if isinstance(link, dict):
+                link = [link["id"], link["origin_id"], link["origin_slot"],
+                        link["target_id"], link["target_slot"], link.get("type")]
+            link = list(link)
+            self.links[link[0]] = link
+            self._inputs[(link[3], link[4])] = link[0]
+        self.last_node_id = max([graph.get("last_node_id") or 0, *self.nodes], default=0)
+        self.last_link_id = max([graph.get("last_link_id") or 0, *self.links], default=0)
+
+    def serialize(self):
+        """워크플로 형식으로 직렬화한다."""
+        return {
+            "last_node_id": self.last_node_id,
+            "last_link_id": self.last_link_id,
+            "nodes": [copy.deepcopy(node) for node in self.nodes.values()],
+            "links": [list(link) for link in self.links.values()],
+        }
+
+    def widget_index(self, node, cmd):
+        """set_widget 명령이 가리키는 widgets_values 인덱스. 알 수 없으면 None."""
+        if cmd.get("index") is not None:
+            return cmd["index"]
+        if self.resolve_widgets is None:
+            return None
+        names = self.resolve_widgets(node.get("type")) or []
+        if cmd.get("name") in names:
+            return names.index(cmd["name"])
+        return None
+
+    def next_node_id(self):
+        """create_node에 node_id가 없을 때 LiteGraph가 부여할 id."""
+        return self.last_node_id + 1
+
+    def apply(self, cmd, invert=False):
+        """graph_command 하나를 적용한다. 대상이 없으면 브라우저처럼 조용히 무시한다.
+
+        invert=True면 적용 전 상태로 되돌리는 명령을 계산해 반환한다.
+        되돌릴 수 없으면(알 수 없는 명령/위젯) None을 반환한다.
+        """
+        handler = getattr(self, "_apply_" + str(cmd.get("type")), None)
+        if handler is None:
+            return None
+        return handler(cmd, invert)
+
+    def _apply_create_node(self, cmd, invert):
+        node_id = cmd.get("node_id")
+        # LiteGraph는 이미 있는 id면 새 id를 부여한다
+        if node_id is None or node_id in self.nodes:
+            node_id = self.next_node_id()
+        self.last_node_id = max(self.last_node_id, node_id)
+        names = self.resolve_widgets(cmd.get("node_type")) if self.resolve_widgets else None
+        self.nodes[node_id] = {
+            "id": node_id,
+            "type": cmd.get("node_type"),
+            "pos": [cmd.get("x") or 0, cmd.get("y") or 0],
+            "widgets_values": [None] * len(names or []),
+        }
+        return {"type": "remove_node", "node_id": node_id}
+
+    def _apply_remove_node(self, cmd, invert):
+        node_id = cmd.get("node_id")
+        node = self.nodes.pop(node_id, None)
+        if node is None:
+            return _noop()
+        inverse = None
+        if invert:
+            pos = node.get("pos") or [0, 0]
+            restore = [{"type": "create_node", "node_type": node.get("type"),
+                        "node_id": node_id, "x": pos[0], "y": pos[1]}]
+            values = node.get("widgets_values")
+            if isinstance(values, dict):
+                restore.extend({"type": "set_widget", "node_id": node_id, "name": name, "value": value}
+                               for name, value in values.items())
+            else:
+                restore.extend({"type": "set_widget", "node_id": node_id, "index": index, "value": value}
+                               for index, value in enumerate(values or []) if value is not None)
+            inverse = {"type": "batch", "commands": restore}
+        for link_id, link in list(self.links.items()):
+            if link[1] == node_id or link[3] == node_id:
+                if invert:
+                    restore.append(_connect_command(link))
+                self._remove_link(link_id)
+        return inverse
+
+    def _apply_connect(self, cmd, invert):
+        if cmd.get("from_id") not in self.nodes or cmd.get("to_id") not in self.nodes:
+            return _noop()
+        key = (cmd["to_id"], cmd["to_slot"])
+        inverse = {"type": "disconnect", "node_id": key[0], "slot": key[1]}
+        if key in self._inputs:
+            inverse = _connect_command(self.links[self._inputs[key]])
+            self._remove_link(self._inputs[key])
+        self.last_link_id += 1
+        link = [self.last_link_id, cmd["from_id"], cmd["from_slot"], cmd["to_id"], cmd["to_slot"], "*"]
+        self.links[link[0]] = link
+        self._inputs[key] = link[0]
+        return inverse
+
+    def _apply_disconnect(self, cmd, invert):
+        link_id = self._inputs.get((cmd.get("node_id"), cmd.get("slot")))
+        if link_id is None:
+            return _noop()
+        inverse = _connect_command(self.links[link_id])
+        self._remove_link(link_id)
+        return inverse
+
+    def _apply_set_widget(self, cmd, invert):
+        node = self.nodes.get(cmd.get("node_id"))
+        if node is None:
+            return _noop()
+        values = node.get("widgets_values")
+        if isinstance(values, dict):
+            name = cmd.get("name")
+            inverse = {"type": "set_widget", "node_id": node["id"], "name": name, "value": values.get(name)}
+            values[name] = cmd.get("value")
+            return inverse
+        index = self.widget_index(node, cmd)
+        if index is None:
+            return None
+        values = node.setdefault("widgets_values", [])
+        if index >= len(values):
+            values.extend([None] * (index + 1 - len(values)))
+        inverse = {"type": "set_widget", "node_id": node["id"], "index": index, "value": values[index]}
+        if cmd.get("name") is not None:
+            inverse["name"] = cmd["name"]
+        values[index] = cmd.get("value")
+        return inverse
+
+    def _apply_move_node(self, cmd, invert):
+        node = self.nodes.get(cmd.get("node_id"))
+        if node is None:
+            return _noop()
+        old = node.get("pos") or [0, 0]
+        node["pos"] = [cmd.get("x"), cmd.get("y")]
+        return {"type": "move_node", "node_id": node["id"], "x": old[0], "y": old[1]}
+
+    def _apply_clear_graph(self, cmd, invert):
+        inverse = {"type": "load_graph", "graph_data": self.serialize()} if invert else None
+        self.configure({})
+        return inverse
+
+    def _apply_load_graph(self, cmd, invert):
+        if not cmd.get("graph_data"):
+            return _noop()
+        inverse = {"type": "load_graph", "graph_data": self.serialize()} if invert else None
+        self.configure(cmd["graph_data"])
+        return inverse
+
+    def _apply_batch(self, cmd, invert):
+        inverses = [self.apply(sub, invert) for sub in cmd.get("commands") or []]
+        if not invert or any(inverse is None for inverse in inverses):
+            return None
+        return {"type": "batch", "commands": inverses[::-1]}
+
+    def _remove_link(self, link_id):
+        link = self.links.pop(link_id, None)
+        if link is not None:
+            self._inputs.pop((link[3], link[4]), None)
@@ -0,0 +1,274 @@
+"""HTTP 엔드포인트: /comfy/graph/template* 워크플로 템플릿 캐시와 인스턴스화."""
+
+import asyncio
+import os
+
+from aiohttp import web
+from server import PromptServer
+
+from . import graph_control
+from .graph_catalog import catalog, node_class_mappings
+from .graph_control import broadcast, queue_prompt, read_json, widget_names, workspace_for
+from .graph_metrics import instrument
+
+
+class TemplateError(ValueError):
+    """템플릿 등록/인스턴스화 요청이 잘못되었을 때 발생한다."""
+
+
+class TemplateStore:
+    """파싱된 워크플로 템플릿과 파라미터 슬롯을 메모리에 보관한다."""
+
+    def __init__(self):
+        self._templates = {}   # name → template dict
+
+    def register(self, name, graph=None, prompt=None, params=None):
+        """템플릿을 등록한다. 같은 이름이 있으면 덮어쓴다.
+
+        params는 {param 이름: {"node_id", "widget", "index"?}} 형식이다.
+        graph(워크플로 형식)가 있으면 위젯 이름을 widgets_values 인덱스로
+        등록 시점에 한 번만 해석해 둔다.
+        """
+        if graph is None and prompt is None:
+            raise TemplateError("missing field: graph or prompt")
+        if graph is not None and not isinstance(graph, dict):
+            raise TemplateError("graph must be an object")
+        if prompt is not None and not isinstance(prompt, dict):
+            raise TemplateError("prompt must be an object")
+        if params is not None and not isinstance(params, dict):
+            raise TemplateError("params must be an object")
+
+        node_index = {}
+        if graph is not None:
+            nodes = graph.get("nodes", [])
+            if not isinstance(nodes, list) or not all(isinstance(node, dict) for node in nodes):
+                raise TemplateError("graph nodes must be a list of objects")
+            for pos, node in enumerate(nodes):
+                if not isinstance(node.get("id"), (int, str, type(None))):
+                    raise TemplateError(f"invalid node id: {node.get('id')!r}")
+                node_index[node.get("id")] = pos
+
+        slots = {}
+        for param, slot in (params or {}).items():
+            if not isinstance(slot, dict) or "node_id" not in slot or "widget" not in slot:
+                raise TemplateError(f"invalid param: {param}")
+            node_id = slot["node_id"]
+            widget = slot["widget"]
+            index = slot.get("index")
+            if not isinstance(node_id, (int, str)):
+                raise TemplateError(f"invalid node_id for param {param}: {node_id!r}")
+            if not isinstance(widget, str):
+                raise TemplateError(f"invalid widget for param {param}: {widget!r}")
+            if index is not None and (not isinstance(index, int) or index < 0):
+                raise TemplateError(f"invalid index for param {param}: {index!r}")
+
+            if graph is not None:
+                if node_id not in node_index:
+                    raise TemplateError(f"unknown node_id for param {param}: {node_id}")
+                node = graph["nodes"][node_index[node_id]]
+                if index is None and not isinstance(node.get("widgets_values"), dict):
+                    names = widget_names(node.get("type")) or []
+                    if widget not in names:
+                        raise TemplateError(f"cannot resolve widget for param {param}: {widget}")
+                    index = names.index(widget)
+            if prompt is not None and not isinstance(prompt.get(str(node_id)), dict):
+                raise TemplateError(f"unknown node_id for param {param}: {node_id}")
+
+            slots[param] = {"node_id": node_id, "widget": widget, "index": index}
+
+        self._templates[name] = {
+            "graph": graph,
+            "prompt": prompt,
+            "params": slots,
+            "node_index": node_index,
+        }
+
+    def remove(self, name):
+        """템플릿을 삭제한다. 존재했으면 True."""
+        return self._templates.pop(name, None) is not None
+
+    def summaries(self):
+        """등록된 템플릿 요약을 반환한다."""
+        return {
+            name: {
+                "params": {
+                    param: {"node_id": slot["node_id"], "widget": slot["widget"]}
+                    for param, slot in tpl["params"].items()
+                },
+                "has_graph": tpl["graph"] is not None,
+                "has_prompt": tpl["prompt"] is not None,
+            }
+            for name, tpl in self._templates.items()
+        }
+
+    def get(self, name):
+        """템플릿을 반환한다. 없으면 None."""
+        return self._templates.get(name)
+
+    @staticmethod
+    def _check_values(tpl, values):
+        for param in values:
+            if param not in tpl["params"]:
+                raise TemplateError(f"unknown param: {param}")
+
+    def instantiate_graph(self, name, values):
+        """파라미터를 치환한 워크플로 그래프를 반환한다.
+
+        치환되는 노드와 그 widgets_values만 복사하고 나머지는 템플릿과 공유한다.
+        """
+        tpl = self._templates[name]
+        if tpl["graph"] is None:
+            raise TemplateError("template has no graph")
+        self._check_values(tpl, values)
+
+        graph = dict(tpl["graph"])
+        graph["nodes"] = list(graph.get("nodes", []))
+        copied = set()
+        for param, value in values.items():
+            slot = tpl["params"][param]
+            pos = tpl["node_index"][slot["node_id"]]
+            if pos not in copied:
+                node = dict(graph["nodes"][pos])
+                widgets_values = node.get("widgets_values")
+                if isinstance(widgets_values, dict):
+                    node["widgets_values"] = dict(widgets_values)
+                else:
+                    node["widgets_values"] = list(widgets_values or [])
+                graph["nodes"][pos] = node
+                copied.add(pos)
+            widgets_values = graph["nodes"][pos]["widgets_values"]
+            if isinstance(widgets_values, dict):
+                widgets_values[slot["widget"]] = value
+            else:
+                index = slot["index"]
+                if index >= len(widgets_values):
+                    widgets_values.extend([None] * (index + 1 - len(widgets_values)))
+                widgets_values[index] = value
+        return graph
+
+    def instantiate_prompt(self, name, values):
+        """파라미터를 치환한 API 형식 prompt를 반환한다."""
+        tpl = self._templates[name]
+        if tpl["prompt"] is None:
+            raise TemplateError("template has no prompt")
+        self._check_values(tpl, values)
+
+        prompt = dict(tpl["prompt"])
+        copied = set()
+        for param, value in values.items():
+            slot = tpl["params"][param]
+            key = str(slot["node_id"])
+            if key not in copied:
+                node = dict(prompt[key])
+                node["inputs"] = dict(node.get("inputs", {}))
+                prompt[key] = node
+                copied.add(key)
+            prompt[key]["inputs"][slot["widget"]] = value
+        return prompt
+
+
+template_store = TemplateStore()
+
+routes = web.RouteTableDef()
+
+
+@routes.post("/comfy/graph/template")
+@instrument
+async def post_template(request):
+    """워크플로 템플릿을 등록한다. graph/prompt 또는 저장된 filename을 받는다."""
+    try:
+        data = await read_json(request)
+    except Exception:
+        return web.json_response({"error": "invalid JSON"}, status=400)
+
+    name = data.get("name")
+    if not name:
+        return web.json_response({"error": "missing field: name"}, status=400)
+    if not isinstance(name, str):
+        return web.json_response({"error": "name must be a string"}, status=400)
+
+    graph = data.get("graph")
+    filename = data.get("filename")
+    if graph is None and filename:
+        safe_name = os.path.basename(filename)
+        if safe_name != filename:
+            return web.json_response({"error": "invalid filename: path traversal"}, status=400)
+        filepath = os.path.join(graph_control.SAVE_DIR, safe_name)
+        if not os.path.exists(filepath):
+            return web.json_response({"error": "file not found"}, status=404)
+        loop = asyncio.get_running_loop()
+        try:
+            graph = await loop.run_in_executor(None, graph_control.graph_files.load, filepath)
+        except ValueError:
+            return web.json_response({"error": f"invalid graph file: {safe_name}"}, status=400)
+
+    # 위젯 이름은 카탈로그에서 해석한다
+    await catalog.ensure(node_class_mappings())
+    try:
+        template_store.register(name, graph=graph, prompt=data.get("prompt"), params=data.get("params"))
+    except TemplateError as e:
+        return web.json_response({"error": str(e)}, status=400)
+
+    return web.json_response({"ok": True})
+
+
+@routes.get("/comfy/graph/templates")
+@instrument
+async def get_templates(request):
+    """등록된 템플릿과 파라미터 슬롯 목록을 반환한다."""
+    return web.json_response(template_store.summaries())
+
+
+@routes.delete("/comfy/graph/template/{name}")
+@instrument
+async def delete_template(request):
+    """템플릿을 삭제한다."""
+    if not template_store.remove(request.match_info["name"]):
+        return web.json_response({"error": "template not found"}, status=404)
+    return web.json_response({"ok": True})
+
+
+@routes.post("/comfy/graph/template/instantiate")
+@instrument
+async def post_instantiate(request):
+    """템플릿에 파라미터를 치환해 load_graph로 보내거나 prompt로 반환/큐잉한다."""
+    try:
+        data = await read_json(request)
+    except Exception:
+        return web.json_response({"error": "invalid JSON"}, status=400)
+
+    name = data.get("name")
+    if not name:
+        return web.json_response({"error": "missing field: name"}, status=400)
+    if not isinstance(name, str):
+        return web.json_response({"error": "name must be a string"}, status=400)
+    if template_store.get(name) is None:
+        return web.json_response({"error": "template not found"}, status=404)
+
+    values = data.get("values") or {}
+    if not isinstance(values, dict):
+        return web.json_response({"error": "values must be an object"}, status=400)
+
+    output = data.get("output", "load_graph")
+    try:
+        if output == "load_graph":
+            graph = template_store.instantiate_graph(name, values)
+            await broadcast({
+                "type": "load_graph",
+                "graph_data": graph,
+            }, workspace=workspace_for(data.get("graph_id")))
+            return web.json_response({"ok": True})
+        if output == "prompt":
+            prompt = template_store.instantiate_prompt(name, values)
+            if data.get("queue"):
+                result = await queue_prompt(prompt)
+                return web.json_response({"ok": True, "prompt_id": result.get("prompt_id")})
+            return web.json_response({"ok": True, "prompt": prompt})
+    except TemplateError as e:
+        return web.json_response({"error": str(e)}, status=400)
+
+    return web.json_response({"error": f"invalid output: {output}"}, status=400)
+
+
+# 서버에 라우트 등록
+PromptServer.instance.app.router.add_routes(routes)
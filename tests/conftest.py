@@ -17,6 +17,7 @@ _mock_instance = MagicMock()
 _mock_instance.send = AsyncMock()
 _mock_instance.send_sync = MagicMock()
 _mock_instance.routes = MagicMock()  # 데코레이터 라우트용 플레이스홀더
+_mock_instance.sockets = {}
 _mock_prompt_server_class.instance = _mock_instance
 _server_module.PromptServer = _mock_prompt_server_class
 sys.modules["server"] = _server_module
@@ -40,3 +41,16 @@ def mock_server():
     _mock_instance.send.reset_mock()
     _mock_instance.send_sync.reset_mock()
     yield _mock_instance
+
+
+@pytest.fixture(autouse=True)
+def editor_connected(mock_server):
+    """기본적으로 에디터 탭 하나가 연결된 상태로 테스트한다."""
+    from nodes.graph_control import editor_presence
+
+    mock_server.sockets = {"test-editor": MagicMock()}
+    editor_presence.register("test-editor")
+    yield "test-editor"
+    mock_server.sockets = {}
+    editor_presence._editors.clear()
+    editor_presence._buffer.clear()
@@ -0,0 +1,24 @@
+"""benchmarks/bench_graph.py 스모크 테스트."""
+
+import json
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def test_bench_quick_emits_json(tmp_path):
+    """--quick 실행이 모든 시나리오 결과를 JSON으로 출력한다."""
+    output = tmp_path / "bench.json"
+    subprocess.run(
+        [sys.executable, "-m", "benchmarks.bench_graph", "--quick", "--output", str(output)],
+        cwd=ROOT, check=True, timeout=60,
+    )
+    report = json.loads(output.read_text())
+    results = report["results"]
+    assert results["batch"]["applied"] == results["batch"]["commands"]
+    assert results["batch"]["commands_per_sec"] > 0
+    assert "10" in results["get_graph"]
+    assert results["catalog"]["classes"] == 50
+    assert "node_types" in results["catalog"] and "all_nodes" in results["catalog"]
@@ -0,0 +1,107 @@
+"""워커 간 공유 캐시 (SharedCache, GraphFileCache, 카탈로그 공유) 테스트."""
+
+import json
+import os
+import sqlite3
+
+from nodes.graph_cache import GraphFileCache, SharedCache
+from nodes.graph_catalog import NodeCatalog
+
+
+class CountingNode:
+    CATEGORY = "test"
+    RETURN_TYPES = ("LATENT",)
+    calls = 0
+
+    @classmethod
+    def INPUT_TYPES(cls):
+        cls.calls += 1
+        return {"required": {"steps": ("INT", {"default": 20})}}
+
+
+def test_shared_cache_visible_to_other_worker(tmp_path):
+    """한 워커가 쓴 값을 같은 디렉토리를 여는 다른 워커가 읽는다."""
+    writer = SharedCache(str(tmp_path), "graphs", shards=4)
+    reader = SharedCache(str(tmp_path), "graphs", shards=4)
+    for i in range(8):
+        writer.put(f"k{i}", f"v{i}".encode())
+    assert [reader.get(f"k{i}") for i in range(8)] == [f"v{i}".encode() for i in range(8)]
+    assert reader.get("missing") is None
+    assert len(list(tmp_path.glob("graphs-*.sqlite3"))) > 1
+
+
+def test_shared_cache_prunes_oldest(tmp_path):
+    """샤드 항목 수가 한도를 넘으면 오래된 항목부터 지운다."""
+    cache = SharedCache(str(tmp_path), "catalog", max_entries=2)
+    for key in ("a", "b", "c"):
+        cache.put(key, b"x")
+    assert cache.get("a") is None
+    assert cache.get("c") == b"x"
+
+
+def test_shared_cache_errors_are_misses(tmp_path):
+    """캐시 파일을 열 수 없으면 예외 대신 미스로 처리한다."""
+    blocker = tmp_path / "not-a-dir"
+    blocker.write_text("")
+    cache = SharedCache(str(blocker / "sub"), "catalog")
+    assert cache.get("k") is None
+    assert cache.put("k", b"v") is False
+
+
+def test_cold_worker_reuses_peer_catalog(tmp_path):
+    """같은 노드 구성이면 다른 워커가 빌드한 카탈로그를 INPUT_TYPES 호출 없이 쓴다."""
+    mappings = {"Counting": CountingNode}
+    CountingNode.calls = 0
+    peer = NodeCatalog(shared=SharedCache(str(tmp_path), "catalog"))
+    peer.build(mappings)
+
+    cold = NodeCatalog(shared=SharedCache(str(tmp_path), "catalog"))
+    cold.build(mappings)
+    assert CountingNode.calls == 1
+    assert cold.source == "shared"
+    assert json.loads(cold.view("node_types")) == json.loads(peer.view("node_types"))
+    assert cold.costs["Counting"]["cached"] is True
+
+    cold.build(mappings, refresh=True)
+    assert CountingNode.calls == 2
+    assert cold.source == "built"
+
+
+def test_graph_file_cache_shared_between_workers(tmp_path):
+    """저장한 워커가 아닌 워커도 공유 캐시에서 파싱된 그래프를 꺼낸다."""
+    path = tmp_path / "g.json"
+    content = json.dumps({"nodes": [{"id": 1}], "links": []}).encode()
+    path.write_bytes(content)
+
+    first = GraphFileCache(shared=SharedCache(str(tmp_path / "cache"), "graphs", shards=4))
+    first.store(str(path), content, json.loads(content))
+
+    # 크기와 mtime이 같은 다른 내용으로 바꿔 두면, 파일을 다시 읽지 않았는지 확인할 수 있다
+    stat = path.stat()
+    path.write_bytes(content.replace(b"1", b"9"))
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+
+    second = GraphFileCache(shared=SharedCache(str(tmp_path / "cache"), "graphs", shards=4))
+    assert second.load(str(path)) == {"nodes": [{"id": 1}], "links": []}
+
+
+def test_graph_file_cache_detects_changes(tmp_path):
+    """파일이 바뀌면 다시 읽는다."""
+    path = tmp_path / "g.json"
+    path.write_text(json.dumps({"nodes": []}))
+    cache = GraphFileCache()
+    assert cache.load(str(path)) == {"nodes": []}
+
+    path.write_text(json.dumps({"nodes": [{"id": 2}]}))
+    assert cache.load(str(path)) == {"nodes": [{"id": 2}]}
+
+
+def test_shared_cache_indexes_created(tmp_path):
+    """오래된 항목 정리가 created 색인을 쓴다."""
+    cache = SharedCache(str(tmp_path), "catalog")
+    cache.put("k", b"v")
+    conn = sqlite3.connect(str(tmp_path / "catalog.sqlite3"))
+    plan = conn.execute(
+        "EXPLAIN QUERY PLAN SELECT key FROM entries ORDER BY created DESC LIMIT -1 OFFSET 1"
+    ).fetchall()
+    assert any("entries_created" in row[-1] for row in plan)
@@ -0,0 +1,285 @@
+"""노드 카탈로그 캐시 + GET /comfy/graph/status, /catalog/stats 테스트."""
+
+import json
+import os
+import sys
+import threading
+import time
+
+import pytest
+from aiohttp import web
+
+import nodes.graph_catalog as graph_catalog_module
+from nodes.graph_catalog import NodeCatalog, fingerprint, install_warmup, watched_dirs
+from nodes.graph_catalog import routes as catalog_routes
+from nodes.graph_control import routes
+
+
+class CountingNode:
+    CATEGORY = "test"
+    RETURN_TYPES = ("LATENT",)
+    calls = 0
+
+    @classmethod
+    def INPUT_TYPES(cls):
+        cls.calls += 1
+        return {"required": {"steps": ("INT", {"default": 20})}}
+
+
+class BrokenNode:
+    CATEGORY = "broken"
+
+    @classmethod
+    def INPUT_TYPES(cls):
+        raise RuntimeError("scan failed")
+
+
+@pytest.fixture(autouse=True)
+def fresh_catalog(monkeypatch):
+    """매 테스트마다 빈 카탈로그와 노드 구성으로 시작한다."""
+    import nodes as comfy_nodes_ref
+    CountingNode.calls = 0
+    monkeypatch.setattr(comfy_nodes_ref, "NODE_CLASS_MAPPINGS", {"Counting": CountingNode, "Broken": BrokenNode}, raising=False)
+    fresh = NodeCatalog()
+    monkeypatch.setattr(graph_catalog_module, "catalog", fresh)
+    monkeypatch.setattr("nodes.graph_control.catalog", fresh)
+    return fresh
+
+
+@pytest.fixture
+def app(mock_server):
+    application = web.Application()
+    application.router.add_routes(routes)
+    application.router.add_routes(catalog_routes)
+    return application
+
+
+@pytest.fixture
+async def client(app, aiohttp_client):
+    return await aiohttp_client(app)
+
+
+def test_fingerprint_tracks_class_identity():
+    """이름이나 클래스가 바뀌면 지문이 바뀌고, 같은 구성이면 같다."""
+    base = fingerprint({"A": CountingNode})
+    assert fingerprint({"A": CountingNode}) == base
+    assert fingerprint({"B": CountingNode}) != base
+    assert fingerprint({"A": BrokenNode}) != base
+
+
+async def test_single_sweep_serves_both_views(client):
+    """node_types와 all_nodes가 INPUT_TYPES 스윕 한 번을 공유한다."""
+    await client.get("/comfy/graph/node_types")
+    resp = await client.get("/comfy/graph/all_nodes")
+    data = await resp.json()
+    assert data["Counting"]["inputs"] == [{"name": "steps", "type": "INT"}]
+    assert data["Broken"] == {"description": "", "category": "", "inputs": [], "outputs": []}
+    assert CountingNode.calls == 1
+
+
+async def test_refresh_rebuilds(client):
+    """?refresh=1이면 같은 구성이어도 다시 빌드한다."""
+    await client.get("/comfy/graph/node_types")
+    await client.get("/comfy/graph/node_types?refresh=1")
+    assert CountingNode.calls == 2
+
+
+async def test_category_filter_uses_catalog(client):
+    """category 필터도 캐시된 항목에서 계산한다."""
+    resp = await client.get("/comfy/graph/node_types?category=^test$")
+    assert list(await resp.json()) == ["Counting"]
+    await client.get("/comfy/graph/node_types")
+    assert CountingNode.calls == 1
+
+
+async def test_status_reports_warm(client):
+    """카탈로그가 빌드되기 전에는 warm이 false, 빌드 후 true."""
+    resp = await client.get("/comfy/graph/status")
+    data = await resp.json()
+    assert data["warm"] is False
+    assert data["catalog"]["classes"] == 0
+
+    await client.get("/comfy/graph/all_nodes")
+    data = await (await client.get("/comfy/graph/status")).json()
+    assert data["warm"] is True
+    assert data["catalog"]["classes"] == 2
+
+
+async def test_background_warmup_on_startup(aiohttp_client, fresh_catalog, monkeypatch):
+    """background 모드면 앱 시작 시 카탈로그를 빌드한다."""
+    monkeypatch.setattr(graph_catalog_module, "WARMUP_MODE", "background")
+    application = web.Application()
+    application.router.add_routes(routes)
+    install_warmup(application)
+    client = await aiohttp_client(application)
+
+    data = await (await client.get("/comfy/graph/status")).json()
+    for _ in range(50):
+        if data["warm"]:
+            break
+        data = await (await client.get("/comfy/graph/status")).json()
+    assert data["warm"] is True
+
+
+class SlowNode:
+    CATEGORY = "slow"
+    calls = 0
+
+    @classmethod
+    def INPUT_TYPES(cls):
+        cls.calls += 1
+        time.sleep(0.1)
+        return {"required": {"ckpt_name": (["a.safetensors"],)}}
+
+
+class HangingNode:
+    CATEGORY = "hang"
+
+    @classmethod
+    def INPUT_TYPES(cls):
+        time.sleep(1.0)
+        return {}
+
+
+def test_timeout_is_isolated(monkeypatch):
+    """제한 시간을 넘긴 클래스만 빈 항목이 되고 나머지는 정상 빌드된다."""
+    monkeypatch.setattr(graph_catalog_module, "INPUT_TYPES_TIMEOUT", 0.2)
+    catalog = NodeCatalog()
+    start = time.perf_counter()
+    catalog.build({"Hanging": HangingNode, "Counting": CountingNode})
+    assert time.perf_counter() - start < 0.8
+
+    data = json.loads(catalog.view("node_types"))
+    assert data["Hanging"] == {"input": {}, "output": [], "category": ""}
+    assert data["Counting"]["category"] == "test"
+    assert catalog.costs["Hanging"]["status"] == "timeout"
+
+
+def test_hung_class_not_called_again(monkeypatch):
+    """제한 시간을 넘긴 호출이 끝나기 전에는 다시 빌드해도 그 클래스를 또 호출하지 않는다."""
+    monkeypatch.setattr(graph_catalog_module, "INPUT_TYPES_TIMEOUT", 0.1)
+    release = threading.Event()
+    calls = []
+
+    class StuckNode:
+        CATEGORY = "stuck"
+
+        @classmethod
+        def INPUT_TYPES(cls):
+            calls.append(1)
+            release.wait(5)
+            return {}
+
+    catalog = NodeCatalog()
+    catalog.build({"Stuck": StuckNode})
+    catalog.build({"Stuck": StuckNode}, refresh=True)
+    assert len(calls) == 1
+    assert catalog.costs["Stuck"]["status"] == "timeout"
+
+    release.set()
+    deadline = time.monotonic() + 2
+    while catalog._hung and time.monotonic() < deadline:
+        time.sleep(0.01)
+    catalog.build({"Stuck": StuckNode}, refresh=True)
+    assert len(calls) == 2
+    assert catalog.costs["Stuck"]["status"] == "ok"
+
+
+def test_input_directory_changes_rebuild(tmp_path, monkeypatch):
+    """입력 디렉토리에 파일이 추가되면 (LoadImage 목록처럼) 카탈로그를 다시 빌드한다."""
+    inputs = tmp_path / "input"
+    inputs.mkdir()
+    monkeypatch.setattr(sys.modules["folder_paths"], "get_input_directory", lambda: str(inputs), raising=False)
+    monkeypatch.setattr(graph_catalog_module, "MODEL_DIRS_CHECK_SECONDS", 0.0)
+    catalog = NodeCatalog()
+    catalog.build({"Counting": CountingNode})
+    catalog.build({"Counting": CountingNode})
+    assert CountingNode.calls == 1
+
+    (inputs / "cat.png").write_bytes(b"")
+    os.utime(inputs, ns=(0, inputs.stat().st_mtime_ns + 1_000_000_000))
+    catalog.build({"Counting": CountingNode})
+    assert CountingNode.calls == 2
+
+
+def test_hung_workers_are_replaced(monkeypatch):
+    """워커가 모두 멈춘 클래스에 묶여도 나머지 클래스는 새 워커로 제때 빌드된다."""
+    monkeypatch.setattr(graph_catalog_module, "CATALOG_WORKERS", 2)
+    monkeypatch.setattr(graph_catalog_module, "INPUT_TYPES_TIMEOUT", 0.3)
+    mappings = {f"Hanging{i}": type(f"Hanging{i}", (HangingNode,), {}) for i in range(2)}
+    mappings.update({f"Counting{i}": type(f"Counting{i}", (CountingNode,), {}) for i in range(10)})
+    catalog = NodeCatalog()
+    start = time.perf_counter()
+    catalog.build(mappings)
+    assert time.perf_counter() - start < 0.8
+
+    statuses = {name: cost["status"] for name, cost in catalog.costs.items()}
+    assert [name for name, status in statuses.items() if status == "timeout"] == ["Hanging0", "Hanging1"]
+
+
+def test_input_types_run_in_parallel():
+    """INPUT_TYPES()는 워커 풀에서 병렬로 호출된다."""
+    slow_classes = {f"Slow{i}": type(f"Slow{i}", (SlowNode,), {}) for i in range(4)}
+    catalog = NodeCatalog()
+    start = time.perf_counter()
+    catalog.build(slow_classes)
+    assert time.perf_counter() - start < 0.3
+
+
+def test_slow_results_cached_until_model_dirs_change(tmp_path, monkeypatch):
+    """느린 클래스의 결과는 재사용되고, 모델 디렉토리가 바뀌면 다시 호출된다."""
+    models = tmp_path / "checkpoints"
+    models.mkdir()
+    monkeypatch.setattr(sys.modules["folder_paths"], "folder_names_and_paths",
+                        {"checkpoints": ([str(models)], {".safetensors"})}, raising=False)
+    SlowNode.calls = 0
+    catalog = NodeCatalog()
+    mappings = {"Slow": SlowNode, "Counting": CountingNode}
+
+    catalog.build(mappings)
+    catalog.build(mappings, refresh=True)
+    assert (SlowNode.calls, CountingNode.calls) == (1, 2)
+    assert catalog.costs["Slow"]["cached"] is True
+
+    (models / "new.safetensors").write_bytes(b"")
+    os.utime(models, ns=(0, models.stat().st_mtime_ns + 1_000_000_000))
+    monkeypatch.setattr(graph_catalog_module, "MODEL_DIRS_CHECK_SECONDS", 0.0)
+    catalog.build(mappings)
+    assert SlowNode.calls == 2
+
+
+def test_watched_dirs_skip_custom_nodes_and_caches(tmp_path, monkeypatch):
+    """custom_nodes와 .git/__pycache__, 모델이 없는 디렉토리는 지문에 넣지 않는다."""
+    models = tmp_path / "checkpoints"
+    (models / "sdxl").mkdir(parents=True)
+    (models / "sdxl" / "a.safetensors").write_bytes(b"")
+    (models / ".git").mkdir()
+    (models / "docs").mkdir()
+    (models / "docs" / "README.md").write_text("")
+    custom_nodes = tmp_path / "custom_nodes"
+    (custom_nodes / "pack" / "__pycache__").mkdir(parents=True)
+    monkeypatch.setattr(sys.modules["folder_paths"], "folder_names_and_paths", {
+        "checkpoints": ([str(models)], {".safetensors"}),
+        "custom_nodes": ([str(custom_nodes)], set()),
+    }, raising=False)
+
+    assert watched_dirs() == [str(models), str(models / "sdxl")]
+
+    catalog = NodeCatalog()
+    catalog.build({"Counting": CountingNode})
+    (custom_nodes / "pack" / "__pycache__" / "x.pyc").write_bytes(b"")
+    monkeypatch.setattr(graph_catalog_module, "MODEL_DIRS_CHECK_SECONDS", 0.0)
+    catalog.build({"Counting": CountingNode})
+    assert CountingNode.calls == 1
+
+
+async def test_catalog_stats_endpoint(client, fresh_catalog):
+    """클래스별 비용과 노드 팩별 합계를 반환한다."""
+    await client.get("/comfy/graph/node_types")
+    resp = await client.get("/comfy/graph/catalog/stats?limit=1")
+    data = await resp.json()
+    assert data["classes"] == 2
+    assert data["errors"] == 1
+    assert len(data["slowest"]) == 1
+    assert data["packs"][0]["pack"] == CountingNode.__module__.split(".")[0]
+    assert data["packs"][0]["classes"] == 2
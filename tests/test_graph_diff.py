@@ -0,0 +1,180 @@
+"""POST /comfy/graph/sync + diff_graphs 테스트."""
+
+import pytest
+from aiohttp import web
+
+import nodes.graph_control as graph_control_module
+from nodes.graph_control import routes as control_routes
+from nodes.graph_control import state_store
+from nodes.graph_diff import diff_graphs, routes
+from nodes.graph_journal import CommandJournal
+
+
+CURRENT = {
+    "nodes": [
+        {"id": 1, "type": "CheckpointLoaderSimple", "pos": [0, 0], "widgets_values": ["a.safetensors"]},
+        {"id": 2, "type": "KSampler", "pos": [400, 0], "widgets_values": [1, "fixed", 20]},
+        {"id": 3, "type": "SaveImage", "pos": [800, 0], "widgets_values": ["out"]},
+    ],
+    "links": [
+        [1, 1, 0, 2, 0, "MODEL"],
+    ],
+}
+
+
+@pytest.fixture
+def app(mock_server):
+    application = web.Application()
+    application.router.add_routes(routes)
+    application.router.add_routes(control_routes)
+    return application
+
+
+@pytest.fixture
+async def client(app, aiohttp_client):
+    return await aiohttp_client(app)
+
+
+@pytest.fixture(autouse=True)
+def clean_state_store():
+    yield
+    state_store.last_state = None
+
+
+@pytest.fixture(autouse=True)
+def fresh_journal():
+    """매 테스트마다 기본 워크스페이스의 저널(미러)을 새로 만든다."""
+    default = graph_control_module.workspaces.default
+    original = default.journal
+    default.journal = CommandJournal(spill_path="", resolve_widgets=graph_control_module.widget_names)
+    yield default.journal
+    default.journal = original
+
+
+def test_diff_identical_graph_is_empty():
+    """동일한 그래프는 명령이 없다."""
+    assert diff_graphs(CURRENT, CURRENT) == []
+
+
+def test_diff_widget_and_move():
+    """바뀐 위젯 값과 위치만 명령으로 만든다."""
+    target = {
+        "nodes": [
+            CURRENT["nodes"][0],
+            {"id": 2, "type": "KSampler", "pos": [500, 0], "widgets_values": [1, "fixed", 30]},
+            CURRENT["nodes"][2],
+        ],
+        "links": CURRENT["links"],
+    }
+    commands = diff_graphs(CURRENT, target)
+    assert commands == [
+        {"type": "set_widget", "node_id": 2, "index": 2, "value": 30},
+        {"type": "move_node", "node_id": 2, "x": 500, "y": 0},
+    ]
+
+
+def test_diff_create_remove_and_links():
+    """노드 추가/삭제와 링크 변경을 순서대로 만든다."""
+    target = {
+        "nodes": [
+            CURRENT["nodes"][0],
+            CURRENT["nodes"][1],
+            {"id": 4, "type": "PreviewImage", "pos": [800, 200]},
+        ],
+        "links": [
+            [2, 1, 0, 2, 0, "MODEL"],
+            [3, 2, 0, 4, 0, "IMAGE"],
+        ],
+    }
+    commands = diff_graphs(CURRENT, target)
+    types = [cmd["type"] for cmd in commands]
+    assert types == ["remove_node", "create_node", "connect"]
+    assert commands[0]["node_id"] == 3
+    assert commands[1]["node_id"] == 4
+    assert commands[2] == {"type": "connect", "from_id": 2, "from_slot": 0, "to_id": 4, "to_slot": 0}
+
+
+def test_diff_type_change_recreates_with_links():
+    """타입이 바뀐 노드는 같은 id로 재생성하고 링크를 다시 잇는다."""
+    target = {
+        "nodes": [
+            {"id": 1, "type": "UNETLoader", "pos": [0, 0], "widgets_values": ["u.safetensors"]},
+            CURRENT["nodes"][1],
+            CURRENT["nodes"][2],
+        ],
+        "links": CURRENT["links"],
+    }
+    commands = diff_graphs(CURRENT, target)
+    assert commands[0] == {"type": "remove_node", "node_id": 1}
+    assert commands[1]["type"] == "create_node"
+    assert commands[1]["node_id"] == 1
+    assert commands[2]["type"] == "set_widget"
+    assert commands[3]["type"] == "connect"
+
+
+def test_diff_disconnect():
+    """target에 없는 입력 링크는 disconnect한다."""
+    target = dict(CURRENT, links=[])
+    assert diff_graphs(CURRENT, target) == [{"type": "disconnect", "node_id": 2, "slot": 0}]
+
+
+async def test_sync_with_current_sends_one_batch(client, mock_server):
+    """current가 주어지면 diff를 단일 batch 명령으로 전송한다."""
+    target = dict(CURRENT, links=[])
+    resp = await client.post("/comfy/graph/sync", json={"current": CURRENT, "target": target})
+    assert resp.status == 200
+    data = await resp.json()
+    assert data["count"] == 1
+
+    mock_server.send.assert_called_once()
+    call_data = mock_server.send.call_args[0][1]
+    assert call_data["type"] == "batch"
+    assert call_data["commands"] == data["commands"]
+
+
+async def test_sync_dry_run(client, mock_server):
+    """dry_run이면 명령만 반환하고 전송하지 않는다."""
+    target = dict(CURRENT, links=[])
+    resp = await client.post("/comfy/graph/sync", json={"current": CURRENT, "target": target, "dry_run": True})
+    data = await resp.json()
+    assert data["count"] == 1
+    mock_server.send.assert_not_called()
+
+
+async def test_sync_from_mirror(client, mock_server):
+    """source=mirror면 서버측 저널 미러를 current로 사용한다."""
+    await client.post("/comfy/graph/state", json={"data": CURRENT})
+    resp = await client.post("/comfy/graph/sync", json={"target": CURRENT, "source": "mirror"})
+    data = await resp.json()
+    assert data["count"] == 0
+    mock_server.send.assert_not_called()
+
+
+async def test_sync_from_mirror_includes_sent_commands(client, mock_server):
+    """미러 동기화 이후 보낸 명령도 diff 기준에 반영된다."""
+    await client.post("/comfy/graph/state", json={"data": CURRENT})
+    await client.post("/comfy/graph/command", json={"type": "create_node", "node_type": "B"})
+    target = dict(CURRENT, nodes=CURRENT["nodes"] + [{"id": 4, "type": "B", "pos": [0, 0]}])
+
+    resp = await client.post("/comfy/graph/sync", json={"target": target, "source": "mirror", "dry_run": True})
+    assert (await resp.json())["commands"] == []
+
+
+async def test_sync_from_unsynced_mirror(client):
+    """미러가 아직 브라우저와 동기화되지 않았으면 409."""
+    resp = await client.post("/comfy/graph/sync", json={"target": CURRENT, "source": "mirror"})
+    assert resp.status == 409
+
+
+async def test_sync_node_without_id(client):
+    """id 없는 노드가 있으면 400."""
+    target = {"nodes": [{"type": "KSampler"}]}
+    resp = await client.post("/comfy/graph/sync", json={"current": CURRENT, "target": target})
+    assert resp.status == 400
+    assert "id" in (await resp.json())["error"]
+
+
+async def test_sync_missing_target(client):
+    """target 누락 시 400."""
+    resp = await client.post("/comfy/graph/sync", json={})
+    assert resp.status == 400
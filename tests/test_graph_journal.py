@@ -0,0 +1,203 @@
+"""CommandJournal + /comfy/graph/undo, /redo, /journal 테스트."""
+
+import pytest
+from aiohttp import web
+
+import nodes.graph_control as graph_control_module
+from nodes.graph_control import routes
+from nodes.graph_catalog import NodeCatalog
+from nodes.graph_journal import CommandJournal, JournalError
+
+
+GRAPH = {
+    "nodes": [
+        {"id": 1, "type": "A", "pos": [0, 0], "widgets_values": [20]},
+        {"id": 2, "type": "B", "pos": [100, 0], "widgets_values": []},
+    ],
+    "links": [[1, 1, 0, 2, 0, "MODEL"]],
+}
+
+
+@pytest.fixture
+def journal():
+    j = CommandJournal(max_entries=5, spill_path="")
+    j.sync(GRAPH)
+    return j
+
+
+@pytest.fixture(autouse=True)
+def fresh_journal():
+    """매 테스트마다 graph_control의 전역 저널을 새로 만든다."""
+    default = graph_control_module.workspaces.default
+    original = default.journal
+    default.journal = graph_control_module.journal = CommandJournal(resolve_widgets=graph_control_module.widget_names)
+    yield default.journal
+    default.journal = graph_control_module.journal = original
+
+
+@pytest.fixture
+def app(mock_server):
+    application = web.Application()
+    application.router.add_routes(routes)
+    return application
+
+
+@pytest.fixture
+async def client(app, aiohttp_client):
+    return await aiohttp_client(app)
+
+
+def test_record_assigns_seq(journal):
+    """기록된 명령에 증가하는 seq가 붙는다."""
+    first = journal.record({"type": "move_node", "node_id": 1, "x": 5, "y": 5})
+    second = journal.record({"type": "clear_graph"})
+    assert (first["seq"], second["seq"]) == (1, 2)
+
+
+def test_create_node_gets_stable_id(journal):
+    """미러가 동기화되어 있으면 create_node에 다음 node_id가 고정된다."""
+    cmd = journal.record({"type": "create_node", "node_type": "C"})
+    assert cmd["node_id"] == 3
+
+
+def test_undo_redo_set_widget(journal):
+    """undo는 이전 값으로, redo는 새 값으로 되돌린다."""
+    journal.record({"type": "set_widget", "node_id": 1, "index": 0, "value": 30})
+
+    undo = journal.undo()
+    assert undo["type"] == "set_widget"
+    assert undo["value"] == 20
+    assert journal.mirror.nodes[1]["widgets_values"] == [20]
+
+    redo = journal.redo()
+    assert redo["value"] == 30
+    assert journal.mirror.nodes[1]["widgets_values"] == [30]
+
+
+def test_undo_remove_node_restores_links(journal):
+    """remove_node의 역명령은 노드, 위젯, 링크를 복원한다."""
+    journal.record({"type": "remove_node", "node_id": 1})
+    undo = journal.undo()
+    types = [cmd["type"] for cmd in undo["commands"]]
+    assert types == ["create_node", "set_widget", "connect"]
+    assert journal.mirror.serialize()["links"][0][1:5] == [1, 0, 2, 0]
+
+
+def test_undo_connect_restores_previous_link(journal):
+    """기존 입력 링크를 대체한 connect의 역명령은 이전 링크를 다시 잇는다."""
+    journal.record({"type": "create_node", "node_type": "A"})
+    journal.record({"type": "connect", "from_id": 3, "from_slot": 0, "to_id": 2, "to_slot": 0})
+    undo = journal.undo()
+    assert undo["type"] == "connect"
+    assert (undo["from_id"], undo["to_id"]) == (1, 2)
+
+
+def test_unsynced_commands_are_irreversible():
+    """미러 동기화 전 명령은 undo할 수 없다."""
+    j = CommandJournal(spill_path="")
+    j.record({"type": "move_node", "node_id": 1, "x": 0, "y": 0})
+    with pytest.raises(JournalError):
+        j.undo()
+
+
+def test_new_command_clears_redo(journal):
+    """새 명령은 redo 스택을 비운다."""
+    journal.record({"type": "move_node", "node_id": 1, "x": 5, "y": 5})
+    journal.undo()
+    journal.record({"type": "move_node", "node_id": 2, "x": 5, "y": 5})
+    with pytest.raises(JournalError):
+        journal.redo()
+
+
+def test_since_in_memory_and_truncated(journal):
+    """메모리 범위 안이면 항목을, 잘린 범위면 None을 반환한다."""
+    for i in range(8):
+        journal.record({"type": "move_node", "node_id": 1, "x": i, "y": 0})
+    assert [e["seq"] for e in journal.since(5)] == [6, 7, 8]
+    assert journal.since(8) == []
+    assert journal.since(1) is None
+    assert journal.since(9) is None
+
+
+def test_since_reads_spill_file(tmp_path):
+    """spill 파일이 있으면 메모리에서 밀려난 항목도 이어서 반환한다."""
+    j = CommandJournal(max_entries=3, spill_path=str(tmp_path / "journal.jsonl"))
+    for i in range(8):
+        j.record({"type": "move_node", "node_id": 1, "x": i, "y": 0})
+    entries = j.since(1)
+    assert [e["seq"] for e in entries] == [2, 3, 4, 5, 6, 7, 8]
+
+
+def test_mirror_resolves_widgets_from_catalog(monkeypatch):
+    """미러의 위젯 이름은 빌드된 카탈로그에서 해석하고 명령마다 INPUT_TYPES()를 부르지 않는다."""
+    calls = []
+
+    class Sampler:
+        @classmethod
+        def INPUT_TYPES(cls):
+            calls.append(1)
+            return {"required": {"model": ("MODEL",), "seed": ("INT",), "steps": ("INT",)}}
+
+    catalog = NodeCatalog()
+    catalog.build({"Sampler": Sampler})
+    monkeypatch.setattr(graph_control_module, "catalog", catalog)
+    j = CommandJournal(spill_path="", resolve_widgets=graph_control_module.widget_names)
+    j.sync(GRAPH)
+
+    cmd = j.record({"type": "create_node", "node_type": "Sampler"})
+    j.record({"type": "set_widget", "node_id": cmd["node_id"], "name": "steps", "value": 30})
+    assert j.mirror.nodes[cmd["node_id"]]["widgets_values"] == [None, None, 30]
+    assert j.undo()["name"] == "steps"
+    assert len(calls) == 1
+
+
+async def test_undo_endpoint_broadcasts_inverse(client, mock_server, fresh_journal):
+    """/undo가 역명령을 브로드캐스트한다."""
+    await client.post("/comfy/graph/state", json={"data": GRAPH})
+    await client.post("/comfy/graph/command", json={"type": "move_node", "node_id": 2, "x": 9, "y": 9})
+    mock_server.send.reset_mock()
+
+    resp = await client.post("/comfy/graph/undo")
+    assert resp.status == 200
+    data = await resp.json()
+    assert data["command"] == {
+        "type": "move_node", "node_id": 2, "x": 100, "y": 0, "seq": 2, "epoch": fresh_journal.epoch,
+    }
+    sent = mock_server.send.call_args[0][1]
+    assert sent["seq"] == 2
+
+
+async def test_undo_endpoint_nothing_to_undo(client):
+    """되돌릴 명령이 없으면 409."""
+    resp = await client.post("/comfy/graph/undo")
+    assert resp.status == 409
+
+
+async def test_journal_endpoint_catch_up(client):
+    """/journal?since=N은 N 이후 명령만 반환한다."""
+    for i in range(3):
+        await client.post("/comfy/graph/command", json={"type": "move_node", "node_id": 1, "x": i, "y": 0})
+
+    resp = await client.get("/comfy/graph/journal?since=1")
+    data = await resp.json()
+    assert data["seq"] == 3
+    assert [cmd["seq"] for cmd in data["commands"]] == [2, 3]
+    assert data["commands"][0]["x"] == 1
+
+
+async def test_journal_endpoint_after_restart(client, fresh_journal):
+    """이전 프로세스의 seq나 epoch로 catch-up하면 새 epoch와 함께 410."""
+    sent = await (await client.post("/comfy/graph/command", json={"type": "clear_graph"})).json()
+    assert fresh_journal.record({"type": "clear_graph"})["epoch"] == fresh_journal.epoch
+
+    resp = await client.get("/comfy/graph/journal?since=7")
+    assert resp.status == 410
+    assert (await resp.json())["epoch"] == fresh_journal.epoch
+
+    resp = await client.get(f"/comfy/graph/journal?since={sent['seq']}&epoch=old")
+    assert resp.status == 410
+
+    resp = await client.get(f"/comfy/graph/journal?since=0&epoch={fresh_journal.epoch}")
+    data = await resp.json()
+    assert data["epoch"] == fresh_journal.epoch
+    assert [cmd["seq"] for cmd in data["commands"]] == [1, 2]
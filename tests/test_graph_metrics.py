@@ -0,0 +1,118 @@
+"""GET /comfy/graph/metrics + MetricsRegistry 테스트."""
+
+import pytest
+from aiohttp import web
+
+from nodes.graph_control import routes as control_routes, state_store
+from nodes.graph_metrics import MetricsRegistry, metrics, routes
+from ws.graph_ws import process_ws_request
+
+
+@pytest.fixture
+def app(mock_server):
+    application = web.Application()
+    application.router.add_routes(routes)
+    application.router.add_routes(control_routes)
+    return application
+
+
+@pytest.fixture
+async def client(app, aiohttp_client):
+    return await aiohttp_client(app)
+
+
+@pytest.fixture(autouse=True)
+def clean_metrics():
+    metrics.reset()
+    yield
+    metrics.reset()
+    state_store._pending.clear()
+    state_store._results.clear()
+
+
+def test_render_summary_and_histogram():
+    """summary는 분위수/_sum/_count, histogram은 누적 버킷을 렌더링한다."""
+    registry = MetricsRegistry()
+    registry.describe("lat", "summary", "latency")
+    registry.describe("size", "histogram", "size", (10, 100))
+    for v in range(1, 101):
+        registry.observe("lat", v / 100, route="/a")
+    registry.observe("size", 5)
+    registry.observe("size", 50)
+    registry.observe("size", 500)
+
+    text = registry.render()
+    assert "# TYPE lat summary" in text
+    assert 'lat{route="/a",quantile="0.5"} 0.51' in text
+    assert 'lat{route="/a",quantile="0.99"} 1.0' in text
+    assert 'lat_count{route="/a"} 100' in text
+    assert 'size_bucket{le="10"} 1' in text
+    assert 'size_bucket{le="100"} 2' in text
+    assert 'size_bucket{le="+Inf"} 3' in text
+
+
+def test_render_gauge_reads_at_scrape_time():
+    """gauge는 스크레이프 시점에 값을 읽는다."""
+    registry = MetricsRegistry()
+    values = {"n": 1}
+    registry.register_gauge("inflight", "in-flight", lambda: values["n"])
+    values["n"] = 3
+    assert "inflight 3" in registry.render()
+
+
+async def test_metrics_counts_requests(client):
+    """요청 후 라우트별 카운터와 지연 시간이 노출된다."""
+    await client.post("/comfy/graph/command", json={"type": "clear_graph"})
+    await client.post("/comfy/graph/command", json={})
+
+    resp = await client.get("/comfy/graph/metrics")
+    assert resp.status == 200
+    assert resp.content_type == "text/plain"
+    text = await resp.text()
+    assert 'graph_http_requests_total{route="/comfy/graph/command",status="200"} 1' in text
+    assert 'graph_http_requests_total{route="/comfy/graph/command",status="400"} 1' in text
+    assert 'graph_http_request_seconds_count{route="/comfy/graph/command"} 2' in text
+    assert 'graph_json_parse_seconds_count{route="/comfy/graph/command"} 2' in text
+    assert 'graph_send_seconds_count{event="graph_command"} 1' in text
+    assert "graph_ws_inflight 0" in text
+
+
+async def test_metrics_ws_timeout_counter():
+    """WS 타임아웃이 타입별로 집계된다."""
+    await process_ws_request({"request_id": "t-1", "type": "get_graph"}, timeout=0.01)
+    assert 'graph_ws_timeouts_total{type="get_graph"} 1' in metrics.render()
+
+
+async def test_metrics_browser_report(client):
+    """브라우저가 보고한 적용 시간이 기록된다."""
+    resp = await client.post("/comfy/graph/metrics/report", json={
+        "samples": [{"type": "create_node", "ms": 2.5}, {"type": "bad"}],
+    })
+    data = await resp.json()
+    assert data["count"] == 1
+    assert 'graph_browser_apply_seconds_count{type="create_node"} 1' in metrics.render()
+
+
+async def test_state_apply_ms_recorded(client):
+    """/state 회신의 apply_ms가 기록된다."""
+    await client.post("/comfy/graph/state", json={
+        "request_id": "r-1", "data": {}, "type": "get_graph", "apply_ms": 4,
+    })
+    assert 'graph_browser_apply_seconds_sum{type="get_graph"} 0.004' in metrics.render()
+
+
+async def test_unknown_types_share_one_series(client):
+    """클라이언트가 보낸 알 수 없는 타입은 "other" 한 시계열로 묶인다."""
+    await client.post("/comfy/graph/metrics/report", json={
+        "samples": [{"type": f"junk-{i}", "ms": 1} for i in range(50)],
+    })
+    rendered = metrics.render()
+    assert 'graph_browser_apply_seconds_count{type="other"} 50' in rendered
+    assert "junk-" not in rendered
+
+
+async def test_report_body_must_be_object(client):
+    """객체가 아닌 JSON 본문은 400."""
+    resp = await client.post("/comfy/graph/metrics/report", json=[])
+    assert resp.status == 400
+    assert 'graph_json_parse_seconds_count{route="/comfy/graph/metrics/report"} 1' in metrics.render()
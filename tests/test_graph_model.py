@@ -0,0 +1,53 @@
+"""GraphModel 테스트."""
+
+from nodes.graph_model import GraphModel
+
+
+def resolve(node_type):
+    return {"KSampler": ["seed", None, "steps"]}.get(node_type)
+
+
+def test_create_connect_serialize():
+    """노드 생성/연결이 워크플로 형식으로 직렬화된다."""
+    model = GraphModel(resolve_widgets=resolve)
+    model.apply({"type": "create_node", "node_type": "KSampler", "x": 10, "y": 20})
+    model.apply({"type": "create_node", "node_type": "SaveImage", "node_id": 5})
+    model.apply({"type": "connect", "from_id": 1, "from_slot": 0, "to_id": 5, "to_slot": 0})
+
+    graph = model.serialize()
+    assert [node["id"] for node in graph["nodes"]] == [1, 5]
+    assert graph["nodes"][0]["pos"] == [10, 20]
+    assert graph["nodes"][0]["widgets_values"] == [None, None, None]
+    assert graph["links"] == [[1, 1, 0, 5, 0, "*"]]
+    assert graph["last_node_id"] == 5
+
+
+def test_set_widget_by_name_and_index():
+    """set_widget은 이름(해석 가능 시) 또는 인덱스로 값을 바꾼다."""
+    model = GraphModel({"nodes": [{"id": 1, "type": "KSampler", "widgets_values": [1, "fixed", 20]}]}, resolve)
+    model.apply({"type": "set_widget", "node_id": 1, "name": "steps", "value": 30})
+    model.apply({"type": "set_widget", "node_id": 1, "index": 1, "value": "randomize"})
+    model.apply({"type": "set_widget", "node_id": 1, "name": "unknown", "value": 0})
+    assert model.nodes[1]["widgets_values"] == [1, "randomize", 30]
+
+
+def test_connect_replaces_and_remove_drops_links():
+    """입력 슬롯 재연결은 기존 링크를 대체하고, 노드 삭제는 링크도 지운다."""
+    model = GraphModel({"nodes": [{"id": 1}, {"id": 2}, {"id": 3}], "links": [[1, 1, 0, 3, 0, "MODEL"]]})
+    model.apply({"type": "connect", "from_id": 2, "from_slot": 0, "to_id": 3, "to_slot": 0})
+    assert list(model.links.values()) == [[2, 2, 0, 3, 0, "*"]]
+
+    model.apply({"type": "remove_node", "node_id": 2})
+    assert model.links == {}
+
+
+def test_batch_and_clear():
+    """batch는 하위 명령을 적용하고 clear_graph는 비운다."""
+    model = GraphModel()
+    model.apply({"type": "batch", "commands": [
+        {"type": "create_node", "node_type": "A"},
+        {"type": "move_node", "node_id": 1, "x": 5, "y": 6},
+    ]})
+    assert model.nodes[1]["pos"] == [5, 6]
+    model.apply({"type": "clear_graph"})
+    assert model.serialize()["nodes"] == []
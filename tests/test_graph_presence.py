@@ -0,0 +1,101 @@
+"""에디터 presence + 오프라인 버퍼링 테스트."""
+
+import asyncio
+
+import pytest
+from aiohttp import web
+
+import nodes.graph_control as graph_control_module
+from nodes.graph_control import editor_presence, routes
+from ws.graph_ws import process_ws_request
+
+
+@pytest.fixture
+def app(mock_server):
+    application = web.Application()
+    application.router.add_routes(routes)
+    return application
+
+
+@pytest.fixture
+async def client(app, aiohttp_client):
+    return await aiohttp_client(app)
+
+
+@pytest.fixture
+def offline(mock_server):
+    """연결된 에디터가 없는 상태."""
+    mock_server.sockets = {}
+    editor_presence._editors.clear()
+
+
+async def test_command_buffered_when_offline(client, mock_server, offline):
+    """에디터가 없으면 명령을 보내지 않고 버퍼링한다."""
+    resp = await client.post("/comfy/graph/command", json={"type": "clear_graph"})
+    assert resp.status == 200
+    data = await resp.json()
+    assert data["buffered"] is True
+    mock_server.send.assert_not_called()
+
+    resp = await client.get("/comfy/graph/presence")
+    data = await resp.json()
+    assert data == {"connected": False, "editors": 0, "buffered": 1, "policy": "buffer"}
+
+
+async def test_register_flushes_single_batch(client, mock_server, offline):
+    """에디터 등록 시 버퍼링된 명령을 해당 sid로 한 번에 보낸다."""
+    await client.post("/comfy/graph/batch", json={"commands": [
+        {"type": "move_node", "node_id": 1, "x": 0, "y": 0},
+        {"type": "move_node", "node_id": 2, "x": 0, "y": 0},
+    ]})
+    mock_server.sockets = {"tab-1": object()}
+
+    resp = await client.post("/comfy/graph/presence", json={"client_id": "tab-1"})
+    assert (await resp.json())["flushed"] == 2
+
+    mock_server.send.assert_called_once()
+    event, data, sid = mock_server.send.call_args[0]
+    assert (event, data["type"], sid) == ("graph_command", "batch", "tab-1")
+    assert [cmd["node_id"] for cmd in data["commands"]] == [1, 2]
+    assert all("seq" in cmd for cmd in data["commands"])
+    assert editor_presence.buffered == 0
+
+
+async def test_register_prunes_disconnected_editors(client, mock_server, offline):
+    """등록 시 소켓이 사라진 이전 에디터 sid는 목록에서 지운다."""
+    for sid in ("tab-1", "tab-2"):
+        mock_server.sockets = {sid: object()}
+        await client.post("/comfy/graph/presence", json={"client_id": sid})
+    assert editor_presence._editors == {"tab-2"}
+
+
+async def test_fail_policy_returns_503(client, mock_server, offline, monkeypatch):
+    """fail 정책이면 에디터가 없을 때 503."""
+    monkeypatch.setattr(graph_control_module, "OFFLINE_POLICY", "fail")
+    resp = await client.post("/comfy/graph/command", json={"type": "clear_graph"})
+    assert resp.status == 503
+    assert "no editor connected" in (await resp.json())["error"]
+
+
+async def test_full_buffer_returns_503(client, offline, monkeypatch):
+    """버퍼 한도를 넘는 배치는 일부만 버퍼링하지 않고 통째로 거부한다."""
+    monkeypatch.setattr(graph_control_module, "OFFLINE_BUFFER_SIZE", 2)
+    resp = await client.post("/comfy/graph/batch", json={"commands": [{"type": "clear_graph"}] * 3})
+    assert resp.status == 503
+    assert editor_presence.buffered == 0
+
+
+async def test_concurrent_batches_admitted_whole(client, offline, monkeypatch):
+    """동시에 온 배치도 각각 통째로 버퍼링되거나 통째로 거부된다."""
+    monkeypatch.setattr(graph_control_module, "OFFLINE_BUFFER_SIZE", 3)
+    body = {"commands": [{"type": "move_node", "node_id": 1, "x": 0, "y": 0}] * 2}
+    responses = await asyncio.gather(*(client.post("/comfy/graph/batch", json=body) for _ in range(2)))
+    assert sorted(resp.status for resp in responses) == [200, 503]
+    assert editor_presence.buffered == 2
+
+
+async def test_ws_request_fails_fast_when_offline(mock_server, offline):
+    """응답할 에디터가 없으면 타임아웃까지 기다리지 않고 바로 실패한다."""
+    result = await process_ws_request({"request_id": "r1", "type": "get_graph"})
+    assert result == {"request_id": "r1", "status": "error", "message": "no editor connected"}
+    mock_server.send.assert_not_called()
@@ -1,5 +1,6 @@
 """POST /comfy/graph/save, /load 엔드포인트 테스트."""
 
+import asyncio
 import json
 import os
 import tempfile
@@ -76,6 +77,31 @@ async def test_save_rejects_path_traversal(client):
     assert "path" in data["error"].lower() or "filename" in data["error"].lower()
 
 
+async def test_save_graph_id_requests_current_graph(client, save_dir, mock_server):
+    """graph 없이 graph_id만 주면 마지막 /state가 아니라 브라우저의 현재 그래프를 저장한다."""
+    state_store = graph_control_module.workspaces.default.state_store
+    state_store.last_state = {"nodes": [{"id": 1}], "links": []}
+    current = {"nodes": [{"id": 1}, {"id": 2}], "links": []}
+    try:
+        task = asyncio.ensure_future(client.post(
+            "/comfy/graph/save", json={"filename": "live.json", "graph_id": "default"},
+        ))
+        for _ in range(50):
+            if mock_server.send.call_count:
+                break
+            await asyncio.sleep(0.01)
+        request = mock_server.send.call_args[0][1]
+        assert request["type"] == "get_graph"
+        state_store.resolve_pending(request["request_id"], current)
+        resp = await task
+    finally:
+        state_store.last_state = None
+
+    assert resp.status == 200
+    with open(save_dir / "live.json") as f:
+        assert json.load(f) == current
+
+
 # --- Load 테스트 ---
 
 async def test_load_missing_filename(client):
@@ -0,0 +1,204 @@
+"""/comfy/graph/template* 엔드포인트 테스트."""
+
+import json
+from unittest.mock import AsyncMock, patch
+
+import pytest
+from aiohttp import web
+
+import nodes.graph_control as graph_control_module
+from nodes.graph_template import routes, template_store
+
+
+class FakeKSampler:
+    CATEGORY = "sampling"
+    RETURN_TYPES = ("LATENT",)
+
+    @classmethod
+    def INPUT_TYPES(cls):
+        return {
+            "required": {
+                "model": ("MODEL",),
+                "seed": ("INT", {"default": 0}),
+                "steps": ("INT", {"default": 20}),
+                "sampler_name": (["euler", "dpmpp_2m"],),
+            }
+        }
+
+
+GRAPH = {
+    "nodes": [
+        {"id": 3, "type": "KSampler", "widgets_values": [1, "fixed", 20, "euler"]},
+        {"id": 6, "type": "CLIPTextEncode", "widgets_values": ["a cat"]},
+    ],
+    "links": [],
+}
+
+PROMPT = {
+    "3": {"class_type": "KSampler", "inputs": {"seed": 1, "steps": 20}},
+    "6": {"class_type": "CLIPTextEncode", "inputs": {"text": "a cat"}},
+}
+
+
+@pytest.fixture(autouse=True)
+def register_fake_nodes():
+    import nodes as comfy_nodes_ref
+    comfy_nodes_ref.NODE_CLASS_MAPPINGS = {"KSampler": FakeKSampler}
+    yield
+    comfy_nodes_ref.NODE_CLASS_MAPPINGS = {}
+    template_store._templates.clear()
+
+
+@pytest.fixture
+def save_dir(tmp_path):
+    original = graph_control_module.SAVE_DIR
+    graph_control_module.SAVE_DIR = str(tmp_path)
+    yield tmp_path
+    graph_control_module.SAVE_DIR = original
+
+
+@pytest.fixture
+def app(mock_server):
+    application = web.Application()
+    application.router.add_routes(routes)
+    return application
+
+
+@pytest.fixture
+async def client(app, aiohttp_client):
+    return await aiohttp_client(app)
+
+
+async def test_register_resolves_widget_index(client):
+    """위젯 이름이 control_after_generate를 고려한 인덱스로 해석된다."""
+    resp = await client.post("/comfy/graph/template", json={
+        "name": "t2i",
+        "graph": GRAPH,
+        "params": {
+            "seed": {"node_id": 3, "widget": "seed"},
+            "steps": {"node_id": 3, "widget": "steps"},
+            "text": {"node_id": 6, "widget": "text", "index": 0},
+        },
+    })
+    assert resp.status == 200
+    params = template_store.get("t2i")["params"]
+    assert params["seed"]["index"] == 0
+    assert params["steps"]["index"] == 2
+    assert params["text"]["index"] == 0
+
+
+async def test_register_from_saved_file(client, save_dir):
+    """저장된 파일에서 템플릿을 등록한다."""
+    with open(save_dir / "t2i.json", "w") as f:
+        json.dump(GRAPH, f)
+    resp = await client.post("/comfy/graph/template", json={"name": "t2i", "filename": "t2i.json"})
+    assert resp.status == 200
+    assert template_store.get("t2i")["graph"] == GRAPH
+
+
+async def test_register_unresolvable_widget(client):
+    """해석할 수 없는 위젯 이름은 400."""
+    resp = await client.post("/comfy/graph/template", json={
+        "name": "t2i",
+        "graph": GRAPH,
+        "params": {"text": {"node_id": 6, "widget": "text"}},
+    })
+    assert resp.status == 400
+    assert "widget" in (await resp.json())["error"]
+
+
+@pytest.mark.parametrize("body", [
+    {"graph": []},
+    {"graph": {"nodes": [1, 2]}},
+    {"graph": GRAPH, "params": ["seed"]},
+    {"prompt": PROMPT, "params": {"seed": {"node_id": [3], "widget": "seed"}}},
+])
+async def test_register_malformed_input(client, body):
+    """형식이 잘못된 graph/params는 500이 아니라 400."""
+    resp = await client.post("/comfy/graph/template", json={"name": "t2i", **body})
+    assert resp.status == 400
+
+
+@pytest.mark.parametrize("path", ["/comfy/graph/template", "/comfy/graph/template/instantiate"])
+async def test_non_string_name(client, path):
+    """문자열이 아닌 name은 400."""
+    resp = await client.post(path, json={"name": ["t2i"], "graph": GRAPH})
+    assert resp.status == 400
+
+
+async def test_register_corrupt_saved_file(client, save_dir):
+    """JSON이 아닌 저장 파일은 400."""
+    (save_dir / "broken.json").write_text("{not json")
+    resp = await client.post("/comfy/graph/template", json={"name": "t2i", "filename": "broken.json"})
+    assert resp.status == 400
+
+
+async def test_instantiate_load_graph(client, mock_server):
+    """치환된 그래프가 load_graph로 전달되고 템플릿 원본은 변하지 않는다."""
+    await client.post("/comfy/graph/template", json={
+        "name": "t2i",
+        "graph": GRAPH,
+        "params": {"steps": {"node_id": 3, "widget": "steps"}},
+    })
+    resp = await client.post("/comfy/graph/template/instantiate", json={
+        "name": "t2i",
+        "values": {"steps": 30},
+    })
+    assert resp.status == 200
+
+    call_data = mock_server.send.call_args[0][1]
+    assert call_data["type"] == "load_graph"
+    assert call_data["graph_data"]["nodes"][0]["widgets_values"] == [1, "fixed", 30, "euler"]
+    assert GRAPH["nodes"][0]["widgets_values"] == [1, "fixed", 20, "euler"]
+
+
+async def test_instantiate_prompt(client):
+    """output=prompt면 치환된 API prompt를 반환한다."""
+    await client.post("/comfy/graph/template", json={
+        "name": "t2i",
+        "prompt": PROMPT,
+        "params": {"text": {"node_id": 6, "widget": "text"}},
+    })
+    resp = await client.post("/comfy/graph/template/instantiate", json={
+        "name": "t2i",
+        "values": {"text": "a dog"},
+        "output": "prompt",
+    })
+    data = await resp.json()
+    assert data["prompt"]["6"]["inputs"]["text"] == "a dog"
+    assert PROMPT["6"]["inputs"]["text"] == "a cat"
+
+
+async def test_instantiate_prompt_queue(client):
+    """queue=true면 치환된 prompt를 바로 큐에 넣는다."""
+    await client.post("/comfy/graph/template", json={
+        "name": "t2i",
+        "prompt": PROMPT,
+        "params": {"seed": {"node_id": 3, "widget": "seed"}},
+    })
+    with patch("nodes.graph_template.queue_prompt", AsyncMock(return_value={"prompt_id": "p-1"})) as mock_queue:
+        resp = await client.post("/comfy/graph/template/instantiate", json={
+            "name": "t2i",
+            "values": {"seed": 7},
+            "output": "prompt",
+            "queue": True,
+        })
+    data = await resp.json()
+    assert data["prompt_id"] == "p-1"
+    assert mock_queue.call_args[0][0]["3"]["inputs"]["seed"] == 7
+
+
+async def test_instantiate_unknown_param(client):
+    """선언되지 않은 파라미터는 400."""
+    await client.post("/comfy/graph/template", json={"name": "t2i", "graph": GRAPH})
+    resp = await client.post("/comfy/graph/template/instantiate", json={
+        "name": "t2i",
+        "values": {"cfg": 7},
+    })
+    assert resp.status == 400
+
+
+async def test_instantiate_not_found(client):
+    """없는 템플릿은 404."""
+    resp = await client.post("/comfy/graph/template/instantiate", json={"name": "nope"})
+    assert resp.status == 404
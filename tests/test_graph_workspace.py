@@ -0,0 +1,101 @@
+"""graph_id 워크스페이스 라우팅 테스트."""
+
+import asyncio
+
+import pytest
+from aiohttp import web
+
+import nodes.graph_control as graph_control_module
+from nodes.graph_control import routes, workspaces
+from ws.graph_ws import process_ws_request
+
+
+@pytest.fixture
+def app(mock_server):
+    application = web.Application()
+    application.router.add_routes(routes)
+    return application
+
+
+@pytest.fixture
+async def client(app, aiohttp_client):
+    return await aiohttp_client(app)
+
+
+@pytest.fixture(autouse=True)
+def agent_tab(mock_server):
+    """기본 탭(test-editor) 외에 graph_id "agent"를 맡는 탭 하나를 연결한다."""
+    mock_server.sockets["agent-tab"] = object()
+    workspaces.get("agent").presence.register("agent-tab")
+    yield workspaces.get("agent")
+    for workspace in list(workspaces):
+        workspaces.remove(workspace.graph_id)
+
+
+async def test_command_routed_to_workspace_editor(client, mock_server):
+    """graph_id가 있는 명령은 그 워크스페이스의 탭에만 간다."""
+    resp = await client.post("/comfy/graph/command", json={"type": "clear_graph", "graph_id": "agent"})
+    assert (await resp.json())["seq"] == 1
+
+    mock_server.send.assert_called_once()
+    event, data, sid = mock_server.send.call_args[0]
+    assert (event, sid) == ("graph_command", "agent-tab")
+    assert "graph_id" not in data
+
+
+async def test_workspaces_have_separate_journals(client):
+    """워크스페이스마다 seq와 undo 이력이 따로 쌓인다."""
+    await client.post("/comfy/graph/state", json={"graph_id": "agent", "data": {"nodes": [{"id": 1, "type": "A"}]}})
+    await client.post("/comfy/graph/command", json={"type": "move_node", "node_id": 1, "x": 5, "y": 5, "graph_id": "agent"})
+
+    resp = await client.get("/comfy/graph/journal?since=0&graph_id=agent")
+    assert (await resp.json())["seq"] == 1
+
+    resp = await client.post("/comfy/graph/undo?graph_id=agent")
+    assert resp.status == 200
+    assert workspaces.get("agent").journal.mirror.nodes[1]["pos"] == [0, 0]
+
+
+async def test_ws_request_resolved_per_workspace(mock_server, agent_tab):
+    """get_graph는 해당 워크스페이스의 pending 저장소로 응답을 받는다."""
+    task = asyncio.ensure_future(process_ws_request({"request_id": "r1", "type": "get_graph", "graph_id": "agent"}))
+    await asyncio.sleep(0.01)
+    assert "r1" in agent_tab.state_store._pending
+    assert "r1" not in workspaces.default.state_store._pending
+
+    agent_tab.state_store.resolve_pending("r1", {"nodes": []})
+    result = await task
+    assert result["status"] == "ok"
+    assert mock_server.send.call_args[0][2] == "agent-tab"
+
+
+async def test_unknown_workspace_has_no_editor(mock_server):
+    """없는 워크스페이스로의 WS 요청은 에디터 미연결로 바로 실패한다."""
+    result = await process_ws_request({"request_id": "r1", "type": "get_graph", "graph_id": "nobody"})
+    assert result["message"] == "no editor connected"
+    assert workspaces.get("nobody", create=False) is None
+
+
+async def test_invalid_graph_id(client):
+    """형식이 잘못된 graph_id는 400."""
+    resp = await client.post("/comfy/graph/command", json={"type": "clear_graph", "graph_id": "../x"})
+    assert resp.status == 400
+    assert "invalid graph_id" in (await resp.json())["error"]
+
+
+async def test_workspace_limit(client, monkeypatch):
+    """워크스페이스 수 한도를 넘으면 새 graph_id는 400."""
+    monkeypatch.setattr(graph_control_module, "MAX_WORKSPACES", 2)
+    resp = await client.post("/comfy/graph/command", json={"type": "clear_graph", "graph_id": "third"})
+    assert resp.status == 400
+
+
+async def test_list_and_delete_workspaces(client):
+    """목록에 워크스페이스별 상태가 나오고 기본이 아닌 워크스페이스는 삭제할 수 있다."""
+    resp = await client.get("/comfy/graph/workspaces")
+    ids = [ws["graph_id"] for ws in await resp.json()]
+    assert ids == ["default", "agent"]
+
+    assert (await client.delete("/comfy/graph/workspace/agent")).status == 200
+    assert (await client.delete("/comfy/graph/workspace/default")).status == 400
+    assert (await client.delete("/comfy/graph/workspace/agent")).status == 404
@@ -2,13 +2,20 @@
 
 import asyncio
 import json
+import types
+from unittest.mock import MagicMock
 
 import pytest
 from aiohttp import web
 
-from nodes.graph_control import state_store
+from nodes.graph_control import broadcast, state_store, workspaces
 import ws.graph_ws as graph_ws_module
-from ws.graph_ws import routes as ws_routes, process_ws_request
+from ws.graph_ws import (
+    routes as ws_routes,
+    process_ws_request,
+    execution_subscriptions,
+    install_execution_hook,
+)
 
 
 @pytest.fixture
@@ -33,6 +40,9 @@ def clean_state_store():
     state_store._pending.clear()
     state_store._results.clear()
     state_store.last_state = None
+    workspaces.default.invalidate_reads()
+    execution_subscriptions._by_prompt.clear()
+    execution_subscriptions._by_client.clear()
 
 
 async def test_ws_handler_registered(client):
@@ -80,3 +90,129 @@ async def test_ws_missing_request_id(client, mock_server):
         msg = await ws.receive_json()
         assert msg["status"] == "error"
         assert "request_id" in msg["message"]
+
+
+async def test_ws_subscribe_receives_execution_events(client, mock_server):
+    """구독한 prompt의 실행 이벤트만 전달된다."""
+    async with client.ws_connect("/comfy/graph/ws") as ws:
+        await ws.send_json({"type": "subscribe", "prompt_ids": ["p-1"]})
+        msg = await ws.receive_json()
+        assert msg == {"status": "ok", "subscribed": ["p-1"]}
+
+        await execution_subscriptions.publish("executing", {"prompt_id": "p-2", "node": "3"})
+        await execution_subscriptions.publish("executed", {
+            "prompt_id": "p-1",
+            "node": "9",
+            "output": {"images": [{"filename": "a.png", "subfolder": "", "type": "output"}]},
+        })
+
+        msg = await ws.receive_json()
+        assert msg["type"] == "execution"
+        assert msg["event"] == "executed"
+        assert msg["prompt_id"] == "p-1"
+        assert msg["data"]["output"]["images"][0]["filename"] == "a.png"
+
+
+async def test_ws_subscription_ends_on_terminal_event(client, mock_server):
+    """execution_success 이후 구독이 정리된다."""
+    async with client.ws_connect("/comfy/graph/ws") as ws:
+        await ws.send_json({"type": "subscribe", "prompt_ids": ["p-1"]})
+        await ws.receive_json()
+
+        sent = await execution_subscriptions.publish("execution_success", {"prompt_id": "p-1"})
+        assert sent == 1
+        assert not execution_subscriptions.has_subscribers("p-1")
+
+
+async def test_ws_unsubscribe_on_close(client, mock_server):
+    """WS 연결이 끊기면 구독이 해제된다."""
+    async with client.ws_connect("/comfy/graph/ws") as ws:
+        await ws.send_json({"type": "subscribe", "prompt_ids": ["p-1"]})
+        await ws.receive_json()
+        assert execution_subscriptions.has_subscribers("p-1")
+
+    await asyncio.sleep(0.05)
+    assert not execution_subscriptions.has_subscribers("p-1")
+
+
+async def test_execution_hook_forwards_subscribed_events():
+    """send_sync 훅은 구독된 prompt 이벤트만 이벤트 루프로 넘긴다."""
+    original = MagicMock()
+    server = types.SimpleNamespace(send_sync=original, loop=asyncio.get_running_loop())
+    install_execution_hook(server)
+
+    received = []
+
+    class FakeWS:
+        closed = False
+
+        async def send_str(self, text):
+            received.append(json.loads(text))
+
+    execution_subscriptions.subscribe(FakeWS(), ["p-1"])
+    server.send_sync("progress", {"prompt_id": "p-1", "value": 1, "max": 20}, "sid")
+    server.send_sync("progress", {"prompt_id": "p-2", "value": 1, "max": 20}, "sid")
+    await asyncio.sleep(0.05)
+
+    assert original.call_count == 2
+    assert [msg["prompt_id"] for msg in received] == ["p-1"]
+
+
+async def test_concurrent_reads_share_one_roundtrip(mock_server):
+    """동시에 들어온 get_graph는 브라우저 요청 하나를 공유하고 각자 request_id로 응답받는다."""
+    tasks = [
+        asyncio.ensure_future(process_ws_request({"request_id": f"r{i}", "type": "get_graph"}))
+        for i in range(5)
+    ]
+    await asyncio.sleep(0.05)
+    assert mock_server.send.call_count == 1
+    state_store.resolve_pending("r0", {"nodes": [1]})
+
+    results = await asyncio.gather(*tasks)
+    assert [r["request_id"] for r in results] == [f"r{i}" for i in range(5)]
+    assert all(r["status"] == "ok" and r["data"] == {"nodes": [1]} for r in results)
+
+
+async def test_read_cache_window(mock_server, monkeypatch):
+    """freshness 창 안의 읽기는 직전 결과를 쓰고, 명령이 나가면 다시 브라우저에 묻는다."""
+    monkeypatch.setattr(graph_ws_module, "READ_CACHE_MS", 10_000)
+
+    async def answer(request_id, data):
+        task = asyncio.ensure_future(process_ws_request({"request_id": request_id, "type": "get_graph"}))
+        await asyncio.sleep(0.01)
+        state_store.resolve_pending(request_id, data)
+        return await task
+
+    await answer("r1", {"nodes": []})
+    result = await process_ws_request({"request_id": "r2", "type": "get_graph"})
+    assert result == {"request_id": "r2", "status": "ok", "data": {"nodes": []}}
+    assert mock_server.send.call_count == 1
+
+    await process_ws_request({"request_id": "c1", "type": "clear_graph"}, timeout=0.01)
+    result = await answer("r3", {"nodes": [2]})
+    assert result["data"] == {"nodes": [2]}
+    assert mock_server.send.call_count == 3
+
+
+async def test_ws_commands_delivered_in_seq_order(mock_server):
+    """WS 명령은 send_lock 안에서 seq를 받으므로, 기다리는 동안 다른 명령이 끼어도 seq 순서대로 전송된다."""
+    sent = []
+
+    async def slow_send(event, data, sid):
+        sent.append(data["seq"])
+        await asyncio.sleep(0.01)
+
+    mock_server.send.side_effect = slow_send
+    try:
+        first = asyncio.ensure_future(broadcast({"type": "clear_graph"}))
+        await asyncio.sleep(0)
+        queued = asyncio.ensure_future(broadcast({"type": "clear_graph"}))
+        await asyncio.sleep(0)
+        ws_task = asyncio.ensure_future(
+            process_ws_request({"request_id": "w1", "type": "clear_graph"}, timeout=0.05)
+        )
+        await asyncio.gather(first, queued, ws_task)
+    finally:
+        mock_server.send.side_effect = None
+
+    assert sent == sorted(sent)
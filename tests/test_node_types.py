@@ -89,3 +89,10 @@ async def test_node_types_filter_by_category(client):
     data = await resp.json()
     assert "CheckpointLoaderSimple" in data
     assert "KSampler" not in data
+
+
+async def test_node_types_invalid_category_pattern(client):
+    """정규식으로 해석할 수 없는 category는 500이 아니라 400."""
+    resp = await client.get("/comfy/graph/node_types", params={"category": "[unclosed"})
+    assert resp.status == 400
+    assert await resp.json() == {"error": "invalid category pattern"}
@@ -0,0 +1,59 @@
+"""ComfyUI custom_nodes 로더처럼 패키지를 임포트하는 테스트.
+
+ComfyUI에서는 최상위 "nodes"가 ComfyUI의 nodes.py이므로, 익스텐션 모듈이 "nodes"를
+절대 경로로 가져오면 로드에 실패하고 라우트가 등록되지 않는다. 테스트 프로세스의
+sys.modules와 섞이지 않도록 별도 프로세스에서 확인한다.
+"""
+
+import json
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+SCRIPT = r"""
+import importlib.util
+import json
+import sys
+import types
+from unittest.mock import MagicMock
+
+server = types.ModuleType("server")
+server.PromptServer = MagicMock()
+sys.modules["server"] = server
+
+# ComfyUI의 최상위 nodes.py
+sys.path.insert(0, sys.argv[2])
+import nodes
+
+spec = importlib.util.spec_from_file_location(
+    "custom_graph_control", sys.argv[1] + "/__init__.py", submodule_search_locations=[sys.argv[1]],
+)
+package = importlib.util.module_from_spec(spec)
+sys.modules[spec.name] = package
+spec.loader.exec_module(package)
+
+print(json.dumps({
+    "modules": sorted(name for name in sys.modules if name.startswith("custom_graph_control.")),
+    "nodes": getattr(sys.modules["nodes"], "__file__", None),
+    "route_tables": server.PromptServer.instance.app.router.add_routes.call_count,
+}))
+"""
+
+
+def test_loads_alongside_comfyui_nodes_module(tmp_path):
+    """최상위 nodes 모듈이 있어도 모든 모듈이 로드되고 라우트가 등록된다."""
+    (tmp_path / "nodes.py").write_text("NODE_CLASS_MAPPINGS = {}\n")
+    result = subprocess.run(
+        [sys.executable, "-c", SCRIPT, ROOT, str(tmp_path)],
+        capture_output=True, text=True, cwd=str(tmp_path), timeout=60,
+    )
+    assert result.returncode == 0, result.stderr
+    data = json.loads(result.stdout.strip().splitlines()[-1])
+
+    assert data["nodes"] == str(tmp_path / "nodes.py")
+    for module in ("nodes.graph_metrics", "nodes.graph_catalog", "nodes.graph_control",
+                   "nodes.graph_template", "nodes.graph_diff", "ws.graph_ws"):
+        assert f"custom_graph_control.{module}" in data["modules"]
+    assert data["route_tables"] == 6
@@ -1,17 +1,41 @@
 import { app } from "../../scripts/app.js";
 import { api } from "../../scripts/api.js";
 
+// 이 탭이 맡는 워크스페이스. 에디터 URL의 ?graph_id=로 지정한다 (기본 "default").
+const GRAPH_ID = new URLSearchParams(window.location.search).get("graph_id") ?? "default";
+
+// 브라우저 측 명령 적용 시간 샘플. 주기적으로 서버 지표로 보고한다.
+const METRICS_FLUSH_MS = 10000;
+const METRICS_MAX_SAMPLES = 1000;
+let applySamples = [];
+
+function recordApply(type, ms) {
+    if (applySamples.length < METRICS_MAX_SAMPLES) {
+        applySamples.push({ type, ms });
+    }
+}
+
+async function flushApplySamples() {
+    if (applySamples.length === 0) return;
+    const samples = applySamples;
+    applySamples = [];
+    try {
+        await fetch("/comfy/graph/metrics/report", {
+            method: "POST",
+            headers: { "Content-Type": "application/json" },
+            body: JSON.stringify({ samples }),
+        });
+    } catch (e) {
+        console.error("[GraphControlEndpoint] 지표 보고 실패:", e);
+    }
+}
+
 /**
- * 그래프 명령을 처리한다 (단방향, fire-and-forget).
+ * 그래프 명령 하나를 graph에 적용한다. 캔버스 갱신은 호출자가 한다.
+ * @param {object} graph - LiteGraph 그래프
  * @param {object} cmd - {type, ...params}
  */
-function handleGraphCommand(cmd) {
-    const graph = app.graph;
-    if (!graph) {
-        console.warn("[GraphControlEndpoint] graph가 아직 초기화되지 않음");
-        return;
-    }
-
+function applyCommand(graph, cmd) {
     switch (cmd.type) {
         case "create_node": {
             const node = LiteGraph.createNode(cmd.node_type);
@@ -19,6 +43,8 @@ function handleGraphCommand(cmd) {
                 console.warn(`[GraphControlEndpoint] 알 수 없는 노드 타입: ${cmd.node_type}`);
                 return;
             }
+            // node_id가 지정되면 그대로 사용 (graph.add가 last_node_id를 갱신)
+            if (cmd.node_id != null) node.id = cmd.node_id;
             node.pos = [cmd.x || 0, cmd.y || 0];
             graph.add(node);
             break;
@@ -44,7 +70,10 @@ function handleGraphCommand(cmd) {
         case "set_widget": {
             const node = graph.getNodeById(cmd.node_id);
             if (!node) break;
-            const widget = node.widgets?.find(w => w.name === cmd.name);
+            // index가 있으면 widgets_values 위치로, 없으면 이름으로 찾는다
+            const widget = cmd.index != null
+                ? node.widgets?.[cmd.index]
+                : node.widgets?.find(w => w.name === cmd.name);
             if (widget) {
                 widget.value = cmd.value;
                 widget.callback?.(widget.value);
@@ -66,12 +95,61 @@ function handleGraphCommand(cmd) {
             }
             break;
         }
+        case "batch": {
+            for (const sub of cmd.commands || []) {
+                applyCommand(graph, sub);
+            }
+            break;
+        }
         default:
             console.warn(`[GraphControlEndpoint] 알 수 없는 명령: ${cmd.type}`);
-            return;
+    }
+}
+
+// 마지막으로 적용한 서버 저널 seq. 재연결 시 이후 명령만 catch-up한다.
+let lastSeq = 0;
+// seq가 속한 저널 epoch. 서버가 재시작되면 바뀌고 seq는 1부터 다시 시작한다.
+let journalEpoch = null;
+
+/**
+ * 명령의 epoch가 알고 있던 것과 다르면 seq 기준을 초기화한다.
+ * @param {string|undefined} epoch
+ */
+function adoptEpoch(epoch) {
+    if (epoch == null || epoch === journalEpoch) return;
+    journalEpoch = epoch;
+    lastSeq = 0;
+}
+
+/**
+ * 그래프 명령을 처리한다 (단방향, fire-and-forget).
+ * @param {object} cmd - {type, seq?, ...params}
+ */
+function handleGraphCommand(cmd) {
+    const graph = app.graph;
+    if (!graph) {
+        console.warn("[GraphControlEndpoint] graph가 아직 초기화되지 않음");
+        return;
+    }
+    if (cmd.seq != null) {
+        adoptEpoch(cmd.epoch);
+        // catch-up과 실시간 수신이 겹치면 이미 적용한 명령은 건너뛴다
+        if (cmd.seq <= lastSeq) return;
+        lastSeq = cmd.seq;
+    } else if (cmd.type === "batch" && cmd.commands?.some((sub) => sub.seq != null)) {
+        // 오프라인 버퍼 flush: seq가 붙은 명령 묶음이므로 하위 명령 단위로 거른다
+        adoptEpoch(cmd.commands.find((sub) => sub.epoch != null)?.epoch);
+        const fresh = cmd.commands.filter((sub) => sub.seq == null || sub.seq > lastSeq);
+        for (const sub of fresh) {
+            if (sub.seq != null) lastSeq = Math.max(lastSeq, sub.seq);
+        }
+        cmd = { ...cmd, commands: fresh };
     }
 
+    const start = performance.now();
+    applyCommand(graph, cmd);
     graph.setDirtyCanvas(true, true);
+    recordApply(cmd.type, performance.now() - start);
 }
 
 /**
@@ -81,6 +159,7 @@ function handleGraphCommand(cmd) {
 async function handleWsRequest(req) {
     const graph = app.graph;
     let result = {};
+    const start = performance.now();
 
     try {
         switch (req.type) {
@@ -96,6 +175,7 @@ async function handleWsRequest(req) {
     } catch (e) {
         result = { error: e.message };
     }
+    const applyMs = performance.now() - start;
 
     // 서버에 결과 회신
     try {
@@ -103,8 +183,11 @@ async function handleWsRequest(req) {
             method: "POST",
             headers: { "Content-Type": "application/json" },
             body: JSON.stringify({
+                graph_id: GRAPH_ID,
                 request_id: req.request_id,
                 data: result,
+                type: req.type,
+                apply_ms: applyMs,
             }),
         });
     } catch (e) {
@@ -112,8 +195,83 @@ async function handleWsRequest(req) {
     }
 }
 
+/**
+ * since 이후의 저널 명령을 요청한다. 알고 있는 epoch를 함께 보내 서버 재시작을 감지한다.
+ * @param {number} since
+ */
+async function fetchJournal(since) {
+    const params = new URLSearchParams({ since, graph_id: GRAPH_ID });
+    if (journalEpoch) params.set("epoch", journalEpoch);
+    const resp = await fetch(`/comfy/graph/journal?${params}`);
+    return { status: resp.status, body: await resp.json() };
+}
+
+/**
+ * 재연결 후 놓친 저널 명령을 받아 순서대로 적용한다.
+ */
+async function catchUpJournal() {
+    if (lastSeq === 0) return;
+    try {
+        let { status, body } = await fetchJournal(lastSeq);
+        if (body.epoch !== journalEpoch || body.seq < lastSeq) {
+            // 서버가 재시작되어 저널이 새로 시작됨: 새 저널의 처음부터 catch-up
+            adoptEpoch(body.epoch);
+            lastSeq = 0;
+            ({ status, body } = await fetchJournal(0));
+        }
+        if (status === 410) {
+            console.warn("[GraphControlEndpoint] 저널이 잘려 catch-up 불가, 그래프를 다시 로드해야 함");
+            return;
+        }
+        for (const cmd of body.commands) {
+            handleGraphCommand(cmd);
+        }
+    } catch (e) {
+        console.error("[GraphControlEndpoint] 저널 catch-up 실패:", e);
+    }
+}
+
+/**
+ * 이 탭을 에디터로 등록한다. 서버는 오프라인 동안 버퍼링한 명령을 batch로 보내준다.
+ */
+async function registerPresence() {
+    const clientId = api.clientId ?? api.initialClientId;
+    if (!clientId) return;
+    try {
+        await fetch("/comfy/graph/presence", {
+            method: "POST",
+            headers: { "Content-Type": "application/json" },
+            body: JSON.stringify({ client_id: clientId, graph_id: GRAPH_ID }),
+        });
+    } catch (e) {
+        console.error("[GraphControlEndpoint] 에디터 등록 실패:", e);
+    }
+}
+
+/**
+ * 현재 그래프를 서버 미러로 보낸다 (request_id 없는 /state).
+ */
+async function pushMirrorState() {
+    if (!app.graph) return;
+    try {
+        await fetch("/comfy/graph/state", {
+            method: "POST",
+            headers: { "Content-Type": "application/json" },
+            body: JSON.stringify({ graph_id: GRAPH_ID, data: app.graph.serialize() }),
+        });
+    } catch (e) {
+        console.error("[GraphControlEndpoint] 미러 동기화 실패:", e);
+    }
+}
+
+let presenceRegistered = false;
+
 app.registerExtension({
     name: "Comfy.GraphControlEndpoint",
+    async afterConfigureGraph() {
+        // 사용자가 워크플로를 불러오면 서버 미러(undo 기준)를 맞춘다
+        await pushMirrorState();
+    },
     async setup() {
         // 단방향 명령 수신
         api.addEventListener("graph_command", (event) => {
@@ -125,6 +283,23 @@ app.registerExtension({
             handleWsRequest(event.detail);
         });
 
-        console.log("[GraphControlEndpoint] 확장 로드 완료");
+        // WS 연결(client_id 확정) 후 에디터 등록. 재연결 시 sid가 바뀌므로 다시 등록한다
+        api.addEventListener("status", () => {
+            if (!presenceRegistered) {
+                presenceRegistered = true;
+                registerPresence();
+            }
+        });
+        registerPresence();
+
+        // 서버 재연결 시 놓친 명령 catch-up
+        api.addEventListener("reconnected", async () => {
+            await catchUpJournal();
+            await registerPresence();
+        });
+
+        setInterval(flushApplySamples, METRICS_FLUSH_MS);
+
+        console.log(`[GraphControlEndpoint] 확장 로드 완료 (graph_id: ${GRAPH_ID})`);
     },
 });
@@ -1,18 +1,162 @@
 """WebSocket 엔드포인트: /comfy/graph/ws 양방향 요청-응답."""
 
 import asyncio
+import functools
 import json
+import os
+import time
 
 from aiohttp import web
 from server import PromptServer
 
-from nodes.graph_control import state_store
+# ComfyUI에서는 "nodes"가 ComfyUI의 nodes.py이므로 이 익스텐션 패키지 기준 상대 경로로 가져온다.
+# 테스트처럼 ws/nodes가 최상위 패키지로 로드된 경우에만 절대 경로를 쓴다.
+if "." in (__package__ or ""):
+    from ..nodes.graph_control import broadcast, workspaces
+    from ..nodes.graph_metrics import metrics, type_label
+else:
+    from nodes.graph_control import broadcast, workspaces
+    from nodes.graph_metrics import metrics, type_label
 
 routes = web.RouteTableDef()
 
 # 테스트에서 조절 가능하도록 모듈 레벨 상수
 DEFAULT_TIMEOUT = 5.0
 
+# 그래프를 바꾸지 않는 WS 요청 타입 (그 외 타입은 명령으로 저널에 기록)
+READ_REQUEST_TYPES = frozenset(("get_graph",))
+
+# 같은 읽기 요청이 이 시간(ms) 안에 다시 오면 브라우저에 묻지 않고 직전 결과를 쓴다. 0이면 끔.
+# 그래프를 바꾸는 명령이 나가면 그 워크스페이스의 직전 결과는 버려진다.
+READ_CACHE_MS = float(os.environ.get("GRAPH_CONTROL_READ_CACHE_MS", "0"))
+
+# 구독 클라이언트에 전달하는 ComfyUI 실행 이벤트
+EXECUTION_EVENTS = frozenset((
+    "execution_start", "execution_cached", "executing", "progress",
+    "executed", "execution_error", "execution_interrupted", "execution_success",
+))
+# 이 이벤트 이후에는 해당 prompt의 구독을 정리한다
+TERMINAL_EVENTS = frozenset(("execution_error", "execution_interrupted", "execution_success"))
+
+
+class ExecutionSubscriptions:
+    """prompt_id별 WS 구독자를 관리하고 실행 이벤트를 전달한다."""
+
+    def __init__(self):
+        self._by_prompt = {}   # prompt_id → set(ws)
+        self._by_client = {}   # ws → set(prompt_id)
+
+    def subscribe(self, ws, prompt_ids):
+        """ws를 prompt_ids의 구독자로 등록한다."""
+        subscribed = self._by_client.setdefault(ws, set())
+        for prompt_id in prompt_ids:
+            self._by_prompt.setdefault(prompt_id, set()).add(ws)
+            subscribed.add(prompt_id)
+
+    def unsubscribe(self, ws, prompt_ids=None):
+        """ws의 구독을 해제한다. prompt_ids가 None이면 전부 해제한다."""
+        subscribed = self._by_client.get(ws, set())
+        targets = list(subscribed) if prompt_ids is None else prompt_ids
+        for prompt_id in targets:
+            subscribed.discard(prompt_id)
+            clients = self._by_prompt.get(prompt_id)
+            if clients is not None:
+                clients.discard(ws)
+                if not clients:
+                    del self._by_prompt[prompt_id]
+        if not subscribed:
+            self._by_client.pop(ws, None)
+
+    def subscriptions(self, ws):
+        """ws가 구독 중인 prompt_id 목록을 반환한다."""
+        return sorted(self._by_client.get(ws, ()))
+
+    def has_subscribers(self, prompt_id):
+        """prompt_id에 구독자가 있으면 True."""
+        return prompt_id in self._by_prompt
+
+    async def publish(self, event, data):
+        """구독자가 있는 prompt의 이벤트만 전달한다. 전달한 클라이언트 수를 반환한다."""
+        prompt_id = data.get("prompt_id")
+        clients = self._by_prompt.get(prompt_id)
+        if not clients:
+            return 0
+
+        # 구독자 수와 무관하게 직렬화는 한 번만
+        text = json.dumps({"type": "execution", "event": event, "prompt_id": prompt_id, "data": data})
+        sent = 0
+        for ws in list(clients):
+            if ws.closed:
+                self.unsubscribe(ws)
+                continue
+            try:
+                await ws.send_str(text)
+                sent += 1
+            except ConnectionError:
+                self.unsubscribe(ws)
+
+        if event in TERMINAL_EVENTS:
+            for ws in list(self._by_prompt.get(prompt_id, ())):
+                self.unsubscribe(ws, [prompt_id])
+        return sent
+
+
+execution_subscriptions = ExecutionSubscriptions()
+
+
+class _ExecutionHook:
+    """send_sync 래퍼. 실행 이벤트를 구독자에게도 전달하고, 그 외 속성은 원래 메서드에 위임한다."""
+
+    def __init__(self, original, server):
+        self._original = original
+        self._server = server
+
+    def __call__(self, event, data, sid=None):
+        self._original(event, data, sid)
+        if (
+            event in EXECUTION_EVENTS
+            and isinstance(data, dict)
+            and execution_subscriptions.has_subscribers(data.get("prompt_id"))
+        ):
+            asyncio.run_coroutine_threadsafe(
+                execution_subscriptions.publish(event, data), self._server.loop,
+            )
+
+    def __getattr__(self, name):
+        return getattr(self._original, name)
+
+
+def install_execution_hook(server=None):
+    """PromptServer.send_sync를 감싸 실행 이벤트를 구독자에게 전달한다.
+
+    ComfyUI 실행 스레드는 send_sync로 이벤트를 보낸다. 구독자가 없는 prompt의
+    이벤트는 dict 조회 한 번으로 걸러지므로 추가 비용이 거의 없다.
+    """
+    if server is None:
+        server = PromptServer.instance
+    if isinstance(server.send_sync, _ExecutionHook):
+        return
+    server.send_sync = _ExecutionHook(server.send_sync, server)
+
+
+def _handle_subscription(ws, request_data):
+    """subscribe/unsubscribe 메시지를 처리하고 응답을 반환한다."""
+    prompt_ids = request_data.get("prompt_ids")
+    if prompt_ids is None and request_data["type"] == "subscribe":
+        return {"status": "error", "message": "missing field: prompt_ids"}
+    if prompt_ids is not None and not isinstance(prompt_ids, list):
+        return {"status": "error", "message": "prompt_ids must be a list"}
+
+    if request_data["type"] == "subscribe":
+        execution_subscriptions.subscribe(ws, prompt_ids)
+    else:
+        execution_subscriptions.unsubscribe(ws, prompt_ids)
+
+    result = {"status": "ok", "subscribed": execution_subscriptions.subscriptions(ws)}
+    if "request_id" in request_data:
+        result["request_id"] = request_data["request_id"]
+    return result
+
 
 async def process_ws_request(request_data, timeout=None):
     """WS 요청을 처리하고 브라우저 응답을 기다린다."""
@@ -23,13 +167,85 @@ async def process_ws_request(request_data, timeout=None):
     if not request_id:
         return {"status": "error", "message": "missing field: request_id"}
 
+    request_data = dict(request_data)
+    try:
+        workspace = workspaces.get(request_data.pop("graph_id", None), create=False)
+    except ValueError as e:
+        return {"request_id": request_id, "status": "error", "message": str(e)}
+
+    # 응답할 에디터가 없으면 타임아웃까지 기다리지 않는다
+    if workspace is None or not workspace.presence.is_connected():
+        return {
+            "request_id": request_id,
+            "status": "error",
+            "message": "no editor connected",
+        }
+
+    if request_data.get("type") in READ_REQUEST_TYPES:
+        return await _coalesced_read(workspace, request_data, timeout)
+
+    def record():
+        workspace.invalidate_reads()
+        return workspace.journal.record(request_data)
+
+    return await _roundtrip(workspace, request_data, timeout, produce=record)
+
+
+async def _coalesced_read(workspace, request_data, timeout):
+    """동시에 들어온 같은 읽기 요청은 브라우저 왕복 한 번의 결과를 나눠 받는다 (single-flight).
+
+    응답의 request_id는 호출자마다 자신의 것이다.
+    """
+    request_id = request_data["request_id"]
+    request_type = type_label(request_data.get("type"))
+    key = json.dumps({k: v for k, v in request_data.items() if k != "request_id"}, sort_keys=True, default=str)
+
+    cached = workspace.read_cache.get(key)
+    if cached is not None and (time.monotonic() - cached[0]) * 1000 < READ_CACHE_MS:
+        metrics.inc("graph_ws_coalesced_total", type=request_type, source="cache")
+        return {"request_id": request_id, "status": "ok", "data": cached[1]}
+
+    task = workspace.reads.get(key)
+    if task is None:
+        task = asyncio.ensure_future(_roundtrip(workspace, request_data, timeout))
+        workspace.reads[key] = task
+        task.add_done_callback(functools.partial(_read_done, workspace, key, workspace.read_generation))
+    else:
+        metrics.inc("graph_ws_coalesced_total", type=request_type, source="inflight")
+
+    # 먼저 온 호출자의 연결이 끊겨도 왕복은 끝까지 진행되어야 한다
+    result = await asyncio.shield(task)
+    return dict(result, request_id=request_id)
+
+
+def _read_done(workspace, key, generation, task):
+    if workspace.reads.get(key) is task:
+        del workspace.reads[key]
+    if task.cancelled() or task.exception() is not None:
+        return
+    result = task.result()
+    # 왕복 도중 그래프가 바뀌었으면 결과를 재사용하지 않는다
+    if READ_CACHE_MS > 0 and result["status"] == "ok" and generation == workspace.read_generation:
+        workspace.read_cache[key] = (time.monotonic(), result["data"])
+
+
+async def _roundtrip(workspace, request_data, timeout, produce=None):
+    """graph_ws_request를 보내고 브라우저가 /state로 회신할 때까지 기다린다.
+
+    produce는 broadcast에 넘겨 send_lock 안에서 저널에 기록한 요청을 보내게 한다.
+    """
+    request_id = request_data["request_id"]
+    state_store = workspace.state_store
+    request_type = type_label(request_data.get("type"))
+    start = time.perf_counter()
     event = state_store.register_pending(request_id)
-    await PromptServer.instance.send("graph_ws_request", request_data)
+    await broadcast(request_data, "graph_ws_request", workspace=workspace, produce=produce)
 
     try:
         await asyncio.wait_for(event.wait(), timeout=timeout)
     except asyncio.TimeoutError:
         state_store.get_and_cleanup(request_id)
+        metrics.inc("graph_ws_timeouts_total", type=request_type)
         return {
             "request_id": request_id,
             "status": "error",
@@ -37,6 +253,7 @@ async def process_ws_request(request_data, timeout=None):
         }
 
     data = state_store.get_and_cleanup(request_id)
+    metrics.observe("graph_ws_roundtrip_seconds", time.perf_counter() - start, type=request_type)
     return {
         "request_id": request_id,
         "status": "ok",
@@ -46,20 +263,30 @@ async def process_ws_request(request_data, timeout=None):
 
 @routes.get("/comfy/graph/ws")
 async def ws_handler(request):
-    """WebSocket 핸들러: JSON 메시지 수신 → process_ws_request → JSON 응답."""
+    """WebSocket 핸들러: JSON 메시지 수신 → process_ws_request → JSON 응답.
+
+    subscribe/unsubscribe 메시지는 실행 이벤트 구독을 관리한다.
+    """
     ws = web.WebSocketResponse()
     await ws.prepare(request)
 
-    async for msg in ws:
-        if msg.type == web.WSMsgType.TEXT:
-            try:
-                request_data = json.loads(msg.data)
-            except json.JSONDecodeError:
-                await ws.send_json({"status": "error", "message": "invalid JSON"})
-                continue
+    try:
+        async for msg in ws:
+            if msg.type == web.WSMsgType.TEXT:
+                try:
+                    request_data = json.loads(msg.data)
+                except json.JSONDecodeError:
+                    await ws.send_json({"status": "error", "message": "invalid JSON"})
+                    continue
+
+                if request_data.get("type") in ("subscribe", "unsubscribe"):
+                    await ws.send_json(_handle_subscription(ws, request_data))
+                    continue
 
-            result = await process_ws_request(request_data)
-            await ws.send_json(result)
+                result = await process_ws_request(request_data)
+                await ws.send_json(result)
+    finally:
+        execution_subscriptions.unsubscribe(ws)
 
     return ws
 